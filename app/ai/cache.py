@@ -0,0 +1,77 @@
+"""In-memory answer cache for repeated RAG queries."""
+import re
+import time
+import logging
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_PUNCT_RE = re.compile(r"[\s.,;:!?।॥\"'()\-]+")
+
+
+def normalize_query(query: str) -> str:
+    """Canonicalize query text so trivially different phrasings share a key."""
+    text = unicodedata.normalize("NFC", query or "").lower()
+    return _PUNCT_RE.sub(" ", text).strip()
+
+
+class AnswerCache:
+    """LRU cache of generated answers with per-entry TTL."""
+
+    def __init__(self, max_entries: int = 512, ttl: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[float, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(query: str, language: str, intent: str) -> Tuple[str, str, str]:
+        return (normalize_query(query), language or "", intent or "general")
+
+    def get(self, query: str, language: str, intent: str) -> Optional[str]:
+        key = self.make_key(query, language, intent)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        stored_at, answer = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return answer
+
+    def put(self, query: str, language: str, intent: str, answer: str):
+        if self.max_entries <= 0:
+            return
+        key = self.make_key(query, language, intent)
+        self._entries[key] = (time.monotonic(), answer)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every cached answer, e.g. after the knowledge base changes."""
+        size = len(self._entries)
+        self._entries.clear()
+        logger.info(f"Answer cache cleared ({size} entries)")
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
@@ -0,0 +1,123 @@
+"""Offline keyword and char n-gram intent classifier."""
+import re
+import logging
+import unicodedata
+from typing import Dict, List, Tuple
+from app.ai.prompts import CONTEXT_PROMPTS
+from app.database.load_data import CATEGORY_KEYWORDS
+
+logger = logging.getLogger(__name__)
+
+# Query vocabulary per category (English, Hindi, Chhattisgarhi, Halbi)
+INTENT_LEXICON = {
+    "scheme": [
+        "scheme", "yojana", "subsidy", "pension", "benefit", "eligibility", "eligible",
+        "apply", "application", "pm-kisan", "ayushman", "ujjwala", "mgnrega", "scholarship",
+        "योजना", "सब्सिडी", "अनुदान", "पेंशन", "लाभ", "आवेदन", "पात्रता", "कुसुम",
+        "किसान सम्मान", "आयुष्मान", "उज्ज्वला", "आवास", "मनरेगा", "छात्रवृत्ति", "फायदा",
+    ],
+    "health": [
+        "health", "doctor", "hospital", "fever", "medicine", "ambulance", "108", "pregnant",
+        "pregnancy", "vaccine", "malaria", "pain", "sick", "cough", "diarrhea", "snake",
+        "स्वास्थ्य", "डॉक्टर", "डाक्टर", "अस्पताल", "बुखार", "दवा", "दवाई", "दवई", "एम्बुलेंस",
+        "गर्भवती", "टीका", "मलेरिया", "दर्द", "पीरा", "बीमार", "खांसी", "इलाज", "दस्त", "साँप", "सांप",
+    ],
+    "agriculture": [
+        "agriculture", "krishi", "crop", "farming", "farm", "seed", "fertilizer", "pest",
+        "paddy", "rice", "sowing", "harvest", "irrigation", "soil", "kvk",
+        "कृषि", "खेती", "किसानी", "खेत", "फसल", "बीज", "खाद", "कीट", "कीड़ा", "धान", "बुवाई",
+        "बोआई", "बोनी", "कटाई", "सिंचाई", "मिट्टी", "किसान",
+    ],
+    "market": [
+        "market", "price", "rate", "mandi", "msp", "sell", "selling", "buy",
+        "बाजार", "बाज़ार", "बजार", "हाट", "मंडी", "भाव", "दाम", "कीमत", "समर्थन मूल्य", "बेच",
+    ],
+    "civic": [
+        "civic", "document", "certificate", "aadhaar", "aadhar", "ration card", "voter",
+        "panchayat", "land record", "complaint", "birth",
+        "दस्तावेज", "दस्तावेज़", "प्रमाण पत्र", "प्रमाणपत्र", "आधार", "राशन कार्ड", "मतदाता",
+        "पंचायत", "जन्म", "पट्टा", "भूमि", "शिकायत",
+    ],
+}
+
+_LATIN_RE = re.compile(r"^[a-z0-9\- ]+$")
+
+
+def _normalize(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", text or "").lower().split())
+
+
+def _trigrams(text: str) -> set:
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class IntentClassifier:
+    """Scores a query against per-category lexicons without any network call."""
+
+    def __init__(self, lexicon: Dict[str, List[str]] = None, min_score: float = 1.0):
+        self.min_score = min_score
+        lexicon = lexicon or INTENT_LEXICON
+        self.categories = list(lexicon)
+
+        self._latin: Dict[str, re.Pattern] = {}
+        self._devanagari: Dict[str, List[str]] = {}
+        profiles: Dict[str, set] = {}
+
+        for category in self.categories:
+            terms = {_normalize(t) for t in lexicon[category] + CATEGORY_KEYWORDS.get(category, [])}
+            latin = sorted(t for t in terms if _LATIN_RE.match(t))
+            self._latin[category] = re.compile(
+                r"\b(?:" + "|".join(re.escape(t) for t in latin) + r")s?\b"
+            ) if latin else None
+            self._devanagari[category] = sorted(terms.difference(latin))
+
+            profile = set()
+            for text in list(terms) + [_normalize(CONTEXT_PROMPTS.get(category, ""))]:
+                for word in text.split():
+                    profile |= _trigrams(word)
+            profiles[category] = profile
+
+        # Only trigrams owned by a single category carry signal
+        owners: Dict[str, List[str]] = {}
+        for category, profile in profiles.items():
+            for gram in profile:
+                owners.setdefault(gram, []).append(category)
+        self._trigram_owner = {g: c[0] for g, c in owners.items() if len(c) == 1}
+
+    def score(self, query: str) -> Dict[str, float]:
+        text = _normalize(query)
+        scores = {category: 0.0 for category in self.categories}
+        if not text:
+            return scores
+
+        for category in self.categories:
+            pattern = self._latin[category]
+            if pattern:
+                scores[category] += 2.0 * len(pattern.findall(text))
+            for term in self._devanagari[category]:
+                pos = text.find(term)
+                if pos < 0:
+                    continue
+                end = pos + len(term)
+                whole_word = (pos == 0 or text[pos - 1] == " ") and (end == len(text) or text[end] == " ")
+                scores[category] += 2.0 if whole_word else 1.0
+
+        ngram_scores = {category: 0.0 for category in self.categories}
+        for word in text.split():
+            for gram in _trigrams(word):
+                owner = self._trigram_owner.get(gram)
+                if owner:
+                    ngram_scores[owner] += 0.1
+        for category, value in ngram_scores.items():
+            scores[category] += min(value, 0.9)
+        return scores
+
+    def classify(self, query: str) -> Tuple[str, float]:
+        """Return (intent, confidence); confidence is 0 when nothing matched."""
+        scores = self.score(query)
+        best = max(scores, key=scores.get)
+        total = sum(scores.values())
+        if scores[best] < self.min_score or total <= 0:
+            return "general", 0.0
+        return best, round(scores[best] / total, 3)
@@ -1,39 +1,148 @@
 """LLM integration using Google Gemini models."""
+import re
+import time
 import logging
 import asyncio
+import threading
 import google.generativeai as genai
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, AsyncIterator, Tuple
 from app.config import get_settings
+from app.ai.intent import IntentClassifier
+from app.ai.prompt_builder import PromptBuilder
+from app.utils.metrics import LLM_REQUESTS, LLM_LATENCY
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+FALLBACK_RESPONSE = "क्षमा करें, समस्या हो रही है।"
+
+# A sentence is complete once its terminator is followed by whitespace
+_SENTENCE_RE = re.compile(r"(.+?[.!?।]+)(?=\s)", re.S)
+
+def split_sentences(buffer: str) -> Tuple[List[str], str]:
+    """Split complete sentences off the front of a streaming buffer."""
+    sentences, pos = [], 0
+    for match in _SENTENCE_RE.finditer(buffer):
+        sentence = match.group(1).strip()
+        if sentence:
+            sentences.append(sentence)
+        pos = match.end()
+    return sentences, buffer[pos:]
+
 class LLM:
     """Interface for generating responses and classifying intent."""
     
     def __init__(self):
         genai.configure(api_key=settings.google_gemini_api_key)
         self.model = genai.GenerativeModel('gemma-3-4b-it')
+        self.intent_classifier = IntentClassifier()
+        self.intent_stats = {"local": 0, "llm": 0}
+        self.prompt_builder = PromptBuilder(
+            budget=settings.prompt_token_budget,
+            history_share=settings.prompt_history_share,
+            min_passage_tokens=settings.prompt_min_passage_tokens
+        )
 
     async def generate_response(
-        self, query: str, context: str, system_prompt: str, history: Optional[List[Dict]] = None
+        self, query: str, documents: List[Dict], system_prompt: str, history: Optional[List[Dict]] = None,
+        trace: Optional[Dict] = None
     ) -> str:
+        start = time.perf_counter()
         try:
-            hist_txt = "\n".join([f"U: {t.get('user')}\nA: {t.get('assistant')}" for t in (history or [])])
-            prompt = f"{system_prompt}\n\nHistory:\n{hist_txt}\n\nContext:\n{context}\n\nQuestion: {query}\n\nAnswer concisely in same language:"
-            
+            prompt = self._build_prompt(query, documents, system_prompt, history, trace)
             resp = await asyncio.to_thread(self.model.generate_content, prompt)
+            LLM_REQUESTS.labels("generate", "ok").inc()
             return resp.text.strip()
         except Exception as e:
             logger.error(f"Gen Error: {e}")
-            return "क्षमा करें, समस्या हो रही है।"
+            LLM_REQUESTS.labels("generate", "error").inc()
+            return FALLBACK_RESPONSE
+        finally:
+            LLM_LATENCY.labels("generate").observe_since(start)
+
+    async def generate_response_stream(
+        self, query: str, documents: List[Dict], system_prompt: str, history: Optional[List[Dict]] = None,
+        trace: Optional[Dict] = None
+    ) -> AsyncIterator[str]:
+        """Yield the answer sentence by sentence while Gemini is still generating."""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+        # Set when the consumer stops early (client gone) so the thread stops pulling chunks
+        stop = threading.Event()
+        prompt = self._build_prompt(query, documents, system_prompt, history, trace)
+
+        def put(item):
+            if not stop.is_set():
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+
+        def produce():
+            try:
+                for chunk in self.model.generate_content(prompt, stream=True):
+                    if stop.is_set():
+                        break
+                    if chunk.text:
+                        put(chunk.text)
+            except Exception as e:
+                put(e)
+            finally:
+                put(done)
+
+        loop.run_in_executor(None, produce)
+        buffer, emitted = "", False
+        start = time.perf_counter()
+        outcome = "ok"
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                sentences, buffer = split_sentences(buffer + item)
+                for sentence in sentences:
+                    emitted = True
+                    yield sentence
+            if buffer.strip():
+                emitted = True
+                yield buffer.strip()
+        except Exception as e:
+            logger.error(f"Stream Error: {e}")
+            outcome = "error"
+            if not emitted:
+                yield FALLBACK_RESPONSE
+        finally:
+            stop.set()
+            LLM_REQUESTS.labels("generate_stream", outcome).inc()
+            LLM_LATENCY.labels("generate_stream").observe_since(start)
+
+    def _build_prompt(
+        self, query: str, documents: List[Dict], system_prompt: str, history: Optional[List[Dict]],
+        trace: Optional[Dict] = None
+    ) -> str:
+        prompt, report = self.prompt_builder.build(query, system_prompt, documents, history)
+        if trace is not None:
+            trace["prompt"] = report
+        return prompt
 
     async def classify_intent(self, query: str) -> str:
+        intent, confidence = self.intent_classifier.classify(query)
+        if confidence >= settings.intent_confidence_threshold:
+            self.intent_stats["local"] += 1
+            LLM_REQUESTS.labels("classify_intent", "local").inc()
+            return intent
+        
+        self.intent_stats["llm"] += 1
+        start = time.perf_counter()
         try:
             prompt = f"Classify into one: scheme, health, agriculture, market, civic, general.\nQuery: {query}\nCategory:"
             resp = await asyncio.to_thread(self.model.generate_content, prompt)
             intent = resp.text.strip().lower()
+            LLM_REQUESTS.labels("classify_intent", "ok").inc()
             return intent if intent in ['scheme', 'health', 'agriculture', 'market', 'civic'] else 'general'
         except Exception as e:
             logger.error(f"Classify Error: {e}")
+            LLM_REQUESTS.labels("classify_intent", "error").inc()
             return 'general'
+        finally:
+            LLM_LATENCY.labels("classify_intent").observe_since(start)
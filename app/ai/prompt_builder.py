@@ -0,0 +1,169 @@
+"""Token-budgeted prompt assembly for answer generation."""
+import re
+import logging
+from typing import Dict, List, Optional, Tuple
+from app.utils.metrics import PROMPT_TOKENS
+
+logger = logging.getLogger(__name__)
+
+NO_CONTEXT = "No relevant information found."
+
+# Rough characters per token for Gemma's SentencePiece vocabulary. Latin words
+# merge into long pieces, Devanagari into short ones; digits and punctuation
+# are nearly one token each. Whitespace is folded into the following piece.
+CHARS_PER_TOKEN = {"latin": 4.0, "devanagari": 2.5, "other": 1.0}
+
+_LATIN_RE = re.compile(r"[A-Za-z\u00C0-\u024F]")
+_DEVANAGARI_RE = re.compile(r"[\u0900-\u097F\uA8E0-\uA8FF\u1CD0-\u1CFF]")
+_SPACE_RE = re.compile(r"\s")
+_SENTENCE_RE = re.compile(r"[^.!?।\n]+[.!?।]*")
+# Runs between spaces and punctuation; \w would split Devanagari at vowel signs
+_WORD_RE = re.compile(r"[^\s.,;:!?।॥\"'()\-]{2,}")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of ``text`` from its mix of scripts."""
+    if not text:
+        return 0
+    latin = len(_LATIN_RE.findall(text))
+    devanagari = len(_DEVANAGARI_RE.findall(text))
+    other = len(text) - latin - devanagari - len(_SPACE_RE.findall(text))
+    tokens = (
+        latin / CHARS_PER_TOKEN["latin"]
+        + devanagari / CHARS_PER_TOKEN["devanagari"]
+        + other / CHARS_PER_TOKEN["other"]
+    )
+    return int(tokens + 0.999)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Longest prefix of ``text``, cut at a word boundary, within ``max_tokens``."""
+    if max_tokens <= 0:
+        return ""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens(text[:mid]) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    cut = text[:lo]
+    space = cut.rfind(" ")
+    return (cut[:space] if space > lo // 2 else cut).rstrip() + "…"
+
+
+def _terms(text: str) -> set:
+    return set(_WORD_RE.findall(text.lower()))
+
+
+class PromptBuilder:
+    """Fit the system prompt, history, retrieved passages and question into a token budget.
+
+    The system prompt and question are always kept whole. Of what is left,
+    up to ``history_share`` goes to past turns, newest first; the rest goes
+    to passages in retrieval order. A passage that does not fit whole keeps
+    the sentences sharing the most words with the question, in their
+    original order, if at least ``min_passage_tokens`` remain.
+    """
+
+    TEMPLATE = "{system}\n\nHistory:\n{history}\n\nContext:\n{context}\n\nQuestion: {query}\n\nAnswer concisely in same language:"
+
+    def __init__(self, budget: int = 1200, history_share: float = 0.3, min_passage_tokens: int = 40):
+        self.budget = budget
+        self.history_share = history_share
+        self.min_passage_tokens = min_passage_tokens
+        self.prompts = 0
+        self.tokens_sent = 0
+        self.tokens_saved = 0
+
+    def build(
+        self, query: str, system_prompt: str, documents: List[Dict], history: Optional[List[Dict]] = None
+    ) -> Tuple[str, Dict]:
+        """Return the prompt and a report of its estimated tokens and what was cut."""
+        passages = [doc.get("content") or "" for doc in documents or []]
+        turns = [(t.get("user") or "", t.get("assistant") or "") for t in history or []]
+        full_tokens = estimate_tokens(self._render(system_prompt, query, turns, passages))
+
+        available = self.budget - estimate_tokens(self._render(system_prompt, query, [], []))
+        kept_turns, history_tokens = self._fit_history(turns, int(max(available, 0) * self.history_share))
+        kept_passages = self._fit_passages(query, passages, available - history_tokens)
+
+        prompt = self._render(system_prompt, query, kept_turns, kept_passages)
+        tokens = estimate_tokens(prompt)
+        saved = max(full_tokens - tokens, 0)
+        self.prompts += 1
+        self.tokens_sent += tokens
+        self.tokens_saved += saved
+        PROMPT_TOKENS.labels("sent").inc(tokens)
+        PROMPT_TOKENS.labels("saved").inc(saved)
+        return prompt, {
+            "tokens": tokens,
+            "budget": self.budget,
+            "tokens_saved": saved,
+            "passages": f"{len(kept_passages)}/{len(passages)}",
+            "turns": f"{len(kept_turns)}/{len(turns)}"
+        }
+
+    def _render(self, system_prompt: str, query: str, turns: List[Tuple[str, str]], passages: List[str]) -> str:
+        history = "\n".join(f"U: {user}\nA: {assistant}" for user, assistant in turns)
+        context = "\n".join(f"[Source {i+1}]: {p}" for i, p in enumerate(passages)) or NO_CONTEXT
+        return self.TEMPLATE.format(system=system_prompt, history=history, context=context, query=query)
+
+    def _fit_history(self, turns: List[Tuple[str, str]], budget: int) -> Tuple[List[Tuple[str, str]], int]:
+        kept, used = [], 0
+        for user, assistant in reversed(turns):
+            cost = estimate_tokens(f"U: {user}\nA: {assistant}\n")
+            if used + cost > budget:
+                # Keep the question and as much of the answer as still fits
+                room = budget - used - estimate_tokens(f"U: {user}\nA: \n")
+                if room >= self.min_passage_tokens:
+                    assistant = truncate_to_tokens(assistant, room)
+                    kept.append((user, assistant))
+                    used += estimate_tokens(f"U: {user}\nA: {assistant}\n")
+                break
+            kept.append((user, assistant))
+            used += cost
+        return kept[::-1], used
+
+    def _fit_passages(self, query: str, passages: List[str], budget: int) -> List[str]:
+        kept, used = [], 0
+        for i, passage in enumerate(passages):
+            cost = estimate_tokens(f"[Source {i+1}]: {passage}\n")
+            if used + cost <= budget:
+                kept.append(passage)
+                used += cost
+                continue
+            room = budget - used - estimate_tokens(f"[Source {i+1}]: \n")
+            if room >= self.min_passage_tokens:
+                kept.append(self._select_sentences(query, passage, room))
+            break
+        return kept
+
+    @staticmethod
+    def _select_sentences(query: str, passage: str, budget: int) -> str:
+        """Keep the sentences most related to the query that fit, in passage order."""
+        sentences = [s.strip() for s in _SENTENCE_RE.findall(passage) if s.strip()]
+        query_terms = _terms(query)
+        ranked = sorted(
+            range(len(sentences)),
+            key=lambda i: (-len(query_terms & _terms(sentences[i])), i)
+        )
+        chosen, used = set(), 0
+        for i in ranked:
+            cost = estimate_tokens(sentences[i]) + 1
+            if used + cost <= budget:
+                chosen.add(i)
+                used += cost
+        if not chosen:
+            return truncate_to_tokens(passage, budget)
+        return " ".join(sentences[i] for i in sorted(chosen))
+
+    def stats(self) -> Dict:
+        return {
+            "budget": self.budget,
+            "prompts": self.prompts,
+            "avg_tokens": round(self.tokens_sent / self.prompts, 1) if self.prompts else 0.0,
+            "tokens_saved": self.tokens_saved
+        }
@@ -1,11 +1,16 @@
 """RAG engine orchestrating retrieval and generation."""
+import time
+import asyncio
 import logging
-from typing import List, Dict, Optional
-from app.ai.llm import LLM
+from typing import List, Dict, Optional, Tuple, AsyncIterator
+from app.ai.llm import LLM, FALLBACK_RESPONSE, split_sentences
+from app.ai.cache import AnswerCache
 from app.ai.prompts import get_system_prompt
+from app.config import get_settings
 from app.database.vector_db import VectorDatabase
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 class RAGEngine:
     """Orchestrates knowledge base retrieval and LLM response generation."""
@@ -13,50 +18,195 @@ class RAGEngine:
     def __init__(self):
         self.vector_db = VectorDatabase()
         self.llm = LLM()
+        self.answer_cache = AnswerCache(
+            max_entries=settings.answer_cache_size,
+            ttl=settings.answer_cache_ttl
+        )
     
     async def get_response(
         self,
         query: str,
         language: str = "hi",
         context: Optional[List[Dict]] = None,
-        caller_id: str = None
+        caller_id: str = None,
+        trace: Optional[Dict] = None
     ) -> str:
-        """Execute RAG pipeline to generate answers."""
+        """Execute RAG pipeline to generate answers.
+        
+        If ``trace`` is given it is filled with the detected intent and
+        per-stage timings in milliseconds.
+        """
+        trace = trace if trace is not None else {}
+        timings = trace.setdefault("timings", {})
+        start = time.perf_counter()
         try:
-            intent = await self.llm.classify_intent(query)
+            # Answers only depend on the query when there is no prior turn
+            cacheable = not context
+            intent, cached, docs = await self._classify_and_retrieve(query, language, cacheable, trace)
+            if cached is not None:
+                return cached
             
-            # Semantic search with intent-based filtering
-            docs = await self.vector_db.search(
-                query=query,
-                top_k=3,
-                filter_metadata={"category": intent} if intent != "general" else None
+            system_prompt = get_system_prompt(language=language, context=intent)
+            
+            answer = await self._timed(
+                self.llm.generate_response(
+                    query=query,
+                    documents=docs,
+                    system_prompt=system_prompt,
+                    history=context,
+                    trace=trace
+                ),
+                timings, "generation"
             )
             
-            context_text = self._format_context(docs)
+            if cacheable and answer != FALLBACK_RESPONSE:
+                self.answer_cache.put(query, language, intent, answer)
+            logger.info(f"RAG timings (ms) intent={intent}: {timings} prompt={trace.get('prompt')}")
+            return answer
+            
+        except Exception as e:
+            logger.error(f"RAG Error: {e}", exc_info=True)
+            return self._fallback(language)
+        finally:
+            timings["rag"] = round((time.perf_counter() - start) * 1000, 1)
+    
+    async def stream_response(
+        self,
+        query: str,
+        language: str = "hi",
+        context: Optional[List[Dict]] = None,
+        trace: Optional[Dict] = None
+    ) -> AsyncIterator[str]:
+        """Streaming variant of ``get_response`` that yields the answer sentence by sentence."""
+        trace = trace if trace is not None else {}
+        timings = trace.setdefault("timings", {})
+        emitted = False
+        try:
+            cacheable = not context
+            intent, cached, docs = await self._classify_and_retrieve(query, language, cacheable, trace)
+            if cached is not None:
+                emitted = True
+                sentences, rest = split_sentences(cached + " ")
+                for sentence in sentences + ([rest.strip()] if rest.strip() else []):
+                    yield sentence
+                return
+            
             system_prompt = get_system_prompt(language=language, context=intent)
             
-            return await self.llm.generate_response(
+            start = time.perf_counter()
+            sentences = []
+            async for sentence in self.llm.generate_response_stream(
                 query=query,
-                context=context_text,
+                documents=docs,
                 system_prompt=system_prompt,
-                history=context
-            )
+                history=context,
+                trace=trace
+            ):
+                if not sentences:
+                    timings["first_sentence"] = round((time.perf_counter() - start) * 1000, 1)
+                sentences.append(sentence)
+                emitted = True
+                yield sentence
+            timings["generation"] = round((time.perf_counter() - start) * 1000, 1)
+            
+            answer = " ".join(sentences)
+            if cacheable and sentences and answer != FALLBACK_RESPONSE:
+                self.answer_cache.put(query, language, intent, answer)
+            logger.info(f"RAG stream timings (ms) intent={intent}: {timings}")
             
         except Exception as e:
-            logger.error(f"RAG Error: {e}", exc_info=True)
-            fallbacks = {
-                "hi": "क्षमा करें, समस्या हो रही है। कृपया 1800-233-1332 पर कॉल करें।",
-                "en": "Sorry, I'm having trouble. Please contact 1800-233-1332.",
-                "chhattisgarhi": "माफ करना, परेशानी हो रहे हे। सरकारी दफ्तर ले संपर्क करव।"
-            }
-            return fallbacks.get(language, fallbacks["hi"])
-    
-    def _format_context(self, documents: List[Dict]) -> str:
-        """Convert retrieved snippets into a single context string."""
-        if not documents:
-            return "No relevant information found."
+            logger.error(f"RAG Stream Error: {e}", exc_info=True)
+            if not emitted:
+                yield self._fallback(language)
+    
+    @staticmethod
+    def _fallback(language: str) -> str:
+        fallbacks = {
+            "hi": "क्षमा करें, समस्या हो रही है। कृपया 1800-233-1332 पर कॉल करें।",
+            "en": "Sorry, I'm having trouble. Please contact 1800-233-1332.",
+            "chhattisgarhi": "माफ करना, परेशानी हो रहे हे। सरकारी दफ्तर ले संपर्क करव।"
+        }
+        return fallbacks.get(language, fallbacks["hi"])
+    
+    async def _classify_and_retrieve(
+        self, query: str, language: str, cacheable: bool, trace: Dict
+    ) -> Tuple[str, Optional[str], List[Dict]]:
+        """Resolve intent, a cached answer if any, and the retrieved documents.
+        
+        In pipelined mode an unfiltered search over ``top_k * rag_candidate_factor``
+        candidates starts alongside intent classification, and the intent filter is
+        applied to those candidates afterwards instead of issuing a second query.
+        """
+        timings = trace["timings"]
+        spans: Dict[str, Tuple[float, float]] = {}
+        top_k = settings.rag_top_k
+        search_task = None
+        if settings.rag_pipelined:
+            search_task = asyncio.create_task(self._timed(
+                self.vector_db.search(query=query, top_k=top_k * settings.rag_candidate_factor),
+                timings, "retrieval", spans
+            ))
+            await asyncio.sleep(0)  # let the search get underway before classifying
+        
+        try:
+            intent = await self._timed(self.llm.classify_intent(query), timings, "classify", spans)
+        except BaseException:
+            if search_task:
+                search_task.cancel()
+            raise
+        trace["intent"] = intent
+        
+        if cacheable:
+            cached = self.answer_cache.get(query, language, intent)
+            trace["cache"] = "hit" if cached is not None else "miss"
+            if cached is not None:
+                if search_task:
+                    search_task.cancel()
+                return intent, cached, []
         
-        return "\n".join([
-            f"[Source {i+1}]: {doc.get('content')}" 
-            for i, doc in enumerate(documents)
-        ])
+        filter_metadata = {"category": intent} if intent != "general" else None
+        if search_task is None:
+            # Semantic search with intent-based filtering
+            docs = await self._timed(
+                self.vector_db.search(query=query, top_k=top_k, filter_metadata=filter_metadata),
+                timings, "retrieval"
+            )
+            return intent, None, docs
+        
+        candidates = await search_task
+        # Measured, not assumed: how long classification and retrieval actually ran together
+        classify_start, classify_end = spans["classify"]
+        retrieval_start, retrieval_end = spans["retrieval"]
+        overlap = min(classify_end, retrieval_end) - max(classify_start, retrieval_start)
+        timings["overlap"] = round(max(overlap, 0.0) * 1000, 1)
+        if not filter_metadata:
+            return intent, None, candidates[:top_k]
+        
+        docs = [d for d in candidates if d.get("metadata", {}).get("category") == intent][:top_k]
+        if not docs:
+            # None of the speculative candidates matched; fall back to a filtered query
+            docs = await self._timed(
+                self.vector_db.search(query=query, top_k=top_k, filter_metadata=filter_metadata),
+                timings, "retrieval_refetch"
+            )
+        return intent, None, docs
+    
+    @staticmethod
+    async def _timed(awaitable, timings: Dict, stage: str, spans: Optional[Dict] = None):
+        start = time.perf_counter()
+        result = await awaitable
+        end = time.perf_counter()
+        timings[stage] = round((end - start) * 1000, 1)
+        if spans is not None:
+            spans[stage] = (start, end)
+        return result
+    
+    def invalidate_cache(self):
+        """Forget cached answers once the knowledge base has been rebuilt."""
+        self.answer_cache.clear()
+    
+    def swap_vector_db(self, vector_db: VectorDatabase) -> VectorDatabase:
+        """Atomically point retrieval at a rebuilt database; returns the old one."""
+        old_db, self.vector_db = self.vector_db, vector_db
+        self.invalidate_cache()
+        return old_db
@@ -18,11 +18,16 @@ class Settings(BaseSettings):
     # AI Providers
     google_gemini_api_key: str = ""
     sarvam_api_key: str = ""
+    sarvam_base_url: str = "https://api.sarvam.ai"
     google_application_credentials: str = ""
     
     # Telephony & Session Management
     max_call_duration: int = 300
     session_timeout: int = 120
+    session_max_entries: int = 10000
+    session_max_bytes: int = 67108864  # 64 MiB
+    session_backend: str = "memory"  # "memory" (one process) or "sqlite" (shared by workers)
+    session_db_path: str = "./data/sessions.db"
     host: str = ""
     ngrok_auth_token: str = ""
     
@@ -30,10 +35,83 @@ class Settings(BaseSettings):
     database_url: str = "sqlite:///./vanvani.db"
     vector_db_path: str = "./data/vector_store"
     
+    # Conversation Writer
+    conversation_batch_size: int = 50
+    conversation_flush_interval: float = 0.5
+    conversation_queue_size: int = 10000
+    
+    # SQLite Performance Profile & Connection Pool
+    sqlite_performance_profile: bool = True
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_mmap_size: int = 268435456  # 256 MiB
+    sqlite_cache_size_kb: int = 65536
+    sqlite_busy_timeout_ms: int = 5000
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    
+    # Simple Vector Store (used when ChromaDB is unavailable)
+    simple_vector_mode: str = "bm25"  # "bm25" or "dense"
+    simple_vector_dim: int = 256
+    
     # User Preferences
     supported_languages: list = ["hi", "en", "chhattisgarhi", "gondi", "halbi"]
     default_language: str = "hi"
     
+    # Answer Cache
+    answer_cache_size: int = 512
+    answer_cache_ttl: int = 3600
+    
+    # Intent Classification
+    intent_confidence_threshold: float = 0.6
+    
+    # Speech HTTP Client
+    speech_http_max_connections: int = 20
+    speech_http_max_keepalive: int = 10
+    speech_http_keepalive_expiry: float = 60.0
+    speech_http_connect_timeout: float = 5.0
+    speech_http2: bool = False  # needs the h2 package
+    sarvam_stt_timeout: float = 30.0
+    sarvam_tts_timeout: float = 30.0
+    
+    # Speech Provider Failover
+    speech_hedge_min_delay: float = 0.3
+    speech_hedge_max_delay: float = 3.0
+    speech_hedge_default_delay: float = 1.0  # until a provider has 20 latency samples
+    speech_breaker_failures: int = 3
+    speech_breaker_reset_seconds: float = 30.0
+    speech_provider_timeout: float = 8.0  # caps sarvam_*_timeout for hedged calls
+    
+    # Speech Audio Cache
+    tts_cache_dir: str = "./data/tts_cache"
+    tts_cache_disk_bytes: int = 268435456  # 256 MiB
+    tts_cache_memory_bytes: int = 33554432  # 32 MiB
+    tts_prewarm: bool = True
+    tts_prewarm_concurrency: int = 4
+    
+    # Prompt Budget
+    prompt_token_budget: int = 1200
+    prompt_history_share: float = 0.3
+    prompt_min_passage_tokens: int = 40
+    
+    # Retrieval
+    rag_top_k: int = 3
+    rag_pipelined: bool = True
+    rag_candidate_factor: int = 4
+    vector_executor_workers: int = 4
+    vector_executor_queue_depth: int = 64
+    reload_drain_seconds: float = 5.0
+    
+    # Ingestion
+    ingest_workers: int = 0  # 0 = one per CPU
+    ingest_queue_size: int = 1024
+    ingest_batch_size: int = 64
+    ingest_pages_per_task: int = 50
+    ingest_dedup: bool = True
+    dedup_threshold: float = 0.8
+    dedup_num_perm: int = 64
+    dedup_bands: int = 8
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
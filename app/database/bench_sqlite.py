@@ -0,0 +1,123 @@
+"""Benchmark SQLite throughput with the performance profile on and off.
+
+Run with ``python -m app.database.bench_sqlite [--rows N] [--readers N]``.
+Each profile gets a fresh database file and is measured on:
+
+- single: one commit per conversation row (the per-turn write pattern)
+- batched: group commits of ``--batch`` rows (the write-behind writer)
+- mixed: single-row commits while ``--readers`` tasks run dashboard queries
+"""
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+from typing import Dict
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database.sql_db import Base, Conversation, create_engine
+
+
+def _row(i: int) -> Conversation:
+    return Conversation(
+        call_sid=f"bench-{i // 5}", caller_id=f"+91{i % 1000:010d}",
+        user_query="PM-KUSUM yojana mein kitni subsidy milti hai?" * 2,
+        ai_response="PM-KUSUM mein solar pump par 60% subsidy milti hai." * 4,
+        language=("hi", "chhattisgarhi", "en")[i % 3], intent="scheme"
+    )
+
+
+async def _single(maker, rows: int, offset: int = 0) -> float:
+    t0 = time.perf_counter()
+    for i in range(rows):
+        async with maker() as session:
+            session.add(_row(offset + i))
+            await session.commit()
+    return rows / (time.perf_counter() - t0)
+
+
+async def _batched(maker, rows: int, batch: int) -> float:
+    t0 = time.perf_counter()
+    for start in range(0, rows, batch):
+        async with maker() as session:
+            session.add_all([_row(i) for i in range(start, min(start + batch, rows))])
+            await session.commit()
+    return rows / (time.perf_counter() - t0)
+
+
+async def _mixed(maker, rows: int, readers: int) -> Dict:
+    reads = errors = 0
+    done = asyncio.Event()
+
+    async def reader():
+        nonlocal reads, errors
+        while not done.is_set():
+            try:
+                async with maker() as session:
+                    await session.execute(
+                        select(Conversation.language, func.count(Conversation.id)).group_by(Conversation.language)
+                    )
+                reads += 1
+            except Exception:
+                errors += 1
+
+    async def writer():
+        nonlocal errors
+        written = 0
+        for i in range(rows):
+            try:
+                async with maker() as session:
+                    session.add(_row(i))
+                    await session.commit()
+                written += 1
+            except Exception:
+                errors += 1
+        done.set()
+        return written
+
+    t0 = time.perf_counter()
+    results = await asyncio.gather(writer(), *[reader() for _ in range(readers)])
+    elapsed = time.perf_counter() - t0
+    return {"writes_per_sec": results[0] / elapsed, "reads_per_sec": reads / elapsed, "errors": errors}
+
+
+async def bench_profile(profile: bool, rows: int, batch: int, readers: int) -> Dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}", sqlite_profile=profile)
+        maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            result = {
+                "single_writes_per_sec": await _single(maker, rows),
+                "batched_writes_per_sec": await _batched(maker, rows * 10, batch),
+            }
+            mixed = await _mixed(maker, rows, readers)
+            result.update({f"mixed_{k}": v for k, v in mixed.items()})
+            return result
+        finally:
+            await engine.dispose()
+
+
+async def main(rows: int, batch: int, readers: int):
+    results = {
+        "default": await bench_profile(False, rows, batch, readers),
+        "performance": await bench_profile(True, rows, batch, readers),
+    }
+    metrics = list(results["default"])
+    width = max(len(m) for m in metrics)
+    print(f"{'metric':<{width}}  {'default':>12}  {'performance':>12}  {'speedup':>8}")
+    for metric in metrics:
+        base, tuned = results["default"][metric], results["performance"][metric]
+        speedup = f"{tuned / base:.1f}x" if base and metric != "mixed_errors" else ""
+        print(f"{metric:<{width}}  {base:>12.1f}  {tuned:>12.1f}  {speedup:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500, help="single-row commits per phase")
+    parser.add_argument("--batch", type=int, default=50, help="rows per group commit")
+    parser.add_argument("--readers", type=int, default=4, help="concurrent dashboard readers")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.batch, args.readers))
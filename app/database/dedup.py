@@ -0,0 +1,101 @@
+"""MinHash/LSH near-duplicate detection for ingested chunks."""
+import unicodedata
+from typing import Dict, Hashable, List, Optional
+import numpy as np
+
+# Mersenne prime for the universal hash family; values stay below 2**31 so
+# a * h + b never overflows uint64
+_PRIME = np.uint64((1 << 31) - 1)
+_HASH_BASE = np.uint32(0x01000193)
+
+
+class MinHasher:
+    """MinHash signatures over character shingles.
+
+    Shingles are taken from case-folded, whitespace-collapsed text so the same
+    boilerplate extracted with different line breaks still matches. The
+    permutations come from a fixed seed, so every worker process produces
+    comparable signatures.
+    """
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_PRIME), size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), size=(num_perm, 1), dtype=np.uint64)
+
+    def _shingles(self, text: str) -> np.ndarray:
+        text = " ".join(unicodedata.normalize("NFC", text).lower().split())
+        codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+        k = min(self.shingle_size, len(codes))
+        if k == 0:
+            return np.zeros(0, dtype=np.uint64)
+
+        count = len(codes) - k + 1
+        h = np.zeros(count, dtype=np.uint32)
+        with np.errstate(over="ignore"):
+            for j in range(k):
+                h = h * _HASH_BASE + codes[j:j + count]
+        return np.unique(h).astype(np.uint64) % _PRIME
+
+    def signature(self, text: str) -> np.ndarray:
+        """Return a (num_perm,) uint32 signature; empty text gets all-max."""
+        shingles = self._shingles(text)
+        if not len(shingles):
+            return np.full(self.num_perm, int(_PRIME), dtype=np.uint32)
+        return ((self._a * shingles + self._b) % _PRIME).min(axis=1).astype(np.uint32)
+
+    def signatures(self, texts: List[str]) -> np.ndarray:
+        matrix = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        for i, text in enumerate(texts):
+            matrix[i] = self.signature(text)
+        return matrix
+
+
+class NearDuplicateIndex:
+    """LSH index over MinHash signatures of the chunks kept so far.
+
+    Signatures are split into ``bands`` bands; chunks sharing any band are
+    candidates and are confirmed by the fraction of equal signature slots, an
+    estimate of their Jaccard similarity. With 64 permutations in 8 bands the
+    banding S-curve sits near 0.77, just under the default 0.8 threshold.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 8, threshold: float = 0.8):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(bands)]
+        self._signatures: List[np.ndarray] = []
+        self._keys: List[Hashable] = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _band_hashes(self, signature: np.ndarray) -> List[int]:
+        return [
+            hash(signature[b * self.rows:(b + 1) * self.rows].tobytes())
+            for b in range(self.bands)
+        ]
+
+    def add_or_match(self, signature: np.ndarray, key: Hashable) -> Optional[Hashable]:
+        """Return the key of a near-duplicate already indexed, else index ``signature``."""
+        band_hashes = self._band_hashes(signature)
+        checked = set()
+        for bucket, band_hash in zip(self._buckets, band_hashes):
+            for idx in bucket.get(band_hash, ()):
+                if idx in checked:
+                    continue
+                checked.add(idx)
+                if np.mean(self._signatures[idx] == signature) >= self.threshold:
+                    return self._keys[idx]
+
+        idx = len(self._keys)
+        self._signatures.append(signature)
+        self._keys.append(key)
+        for bucket, band_hash in zip(self._buckets, band_hashes):
+            bucket.setdefault(band_hash, []).append(idx)
+        return None
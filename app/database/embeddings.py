@@ -0,0 +1,56 @@
+"""Offline hashed char n-gram embeddings for the fallback vector store."""
+import unicodedata
+from typing import List
+import numpy as np
+
+# Odd 32-bit multipliers for the rolling n-gram hash and final mixing
+_HASH_BASE = np.uint32(0x01000193)
+_MIX = np.uint32(0x9E3779B1)
+
+
+class HashedEmbedder:
+    """Embeds text as signed, hashed character n-gram counts.
+
+    Works on raw code points, so Devanagari matras and conjuncts hash the same
+    way as Latin letters and inflected forms of a word share most of their
+    n-grams. No model download or network access is needed.
+    """
+
+    def __init__(self, dim: int = 256, ngram_range=(2, 4)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    def _codepoints(self, text: str) -> np.ndarray:
+        text = " ".join(unicodedata.normalize("NFC", text).lower().split())
+        return np.frombuffer(f" {text} ".encode("utf-32-le"), dtype=np.uint32)
+
+    def embed(self, text: str) -> np.ndarray:
+        """Return a unit-length float32 vector for ``text``."""
+        codes = self._codepoints(text)
+        vec = np.zeros(self.dim, dtype=np.float32)
+        lo, hi = self.ngram_range
+
+        with np.errstate(over="ignore"):
+            for n in range(lo, hi + 1):
+                if len(codes) < n:
+                    break
+                count = len(codes) - n + 1
+                h = np.full(count, n, dtype=np.uint32)
+                for j in range(n):
+                    h = h * _HASH_BASE + codes[j:j + count]
+                h = h * _MIX
+                h ^= h >> np.uint32(15)
+                signs = np.where(h & np.uint32(1), 1.0, -1.0)
+                vec += np.bincount(
+                    (h >> np.uint32(1)) % np.uint32(self.dim), weights=signs, minlength=self.dim
+                ).astype(np.float32)
+
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm > 0 else vec
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Embed many texts into a contiguous (len(texts), dim) float32 matrix."""
+        matrix = np.empty((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            matrix[i] = self.embed(text)
+        return matrix
@@ -9,7 +9,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from app.database.sql_db import init_database
 from app.database.vector_db import VectorDatabase
-from app.database.load_data import create_sample_data
+from app.database.load_data import load_all_documents, shutdown_ingest_pool
 
 logging.basicConfig(
     level=logging.INFO,
@@ -33,10 +33,11 @@ async def main():
         vector_db = VectorDatabase()
         logger.info("✓ Vector database initialized")
         
-        # Load sample data
-        logger.info("Loading sample knowledge base data...")
-        await create_sample_data(vector_db)
-        logger.info("✓ Sample data loaded")
+        # Load PDFs (or sample data when none are present)
+        logger.info("Loading knowledge base data...")
+        await load_all_documents(vector_db)
+        shutdown_ingest_pool()
+        logger.info("✓ Knowledge base data loaded")
         
         # Show stats
         count = vector_db.count_documents()
@@ -1,63 +1,516 @@
 """Data loading utilities for populating the vector database."""
-import uuid
+import os
+import json
+import time
+import asyncio
+import hashlib
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, NamedTuple, Optional, Tuple
+from app.config import get_settings
+
+try:
+    from app.database.dedup import MinHasher, NearDuplicateIndex
+    DEDUP_AVAILABLE = True
+except ImportError:
+    DEDUP_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Manifest entry for the built-in samples used when no PDFs are present
+SAMPLE_ENTRY = "sample_data"
+
+# Extraction workers, kept across reloads: a spawned worker pays for a fresh
+# interpreter and the PDF imports before its first page
+_ingest_pool: Optional[ProcessPoolExecutor] = None
+
+def _ingest_workers() -> int:
+    return settings.ingest_workers or os.cpu_count() or 1
 
-async def load_all_documents(vector_db):
-    """Load documents from data/raw_pdfs into the vector DB."""
+def get_ingest_pool() -> ProcessPoolExecutor:
+    global _ingest_pool
+    if _ingest_pool is None:
+        # spawn rather than fork: the parent runs executor threads
+        _ingest_pool = ProcessPoolExecutor(
+            max_workers=_ingest_workers(),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _ingest_pool
+
+def shutdown_ingest_pool(pool: Optional[ProcessPoolExecutor] = None):
+    """Stop the extraction workers (all of them, or only ``pool`` if it is still current)
+    without waiting for running pages."""
+    global _ingest_pool
+    if _ingest_pool is None or (pool is not None and pool is not _ingest_pool):
+        return
+    _ingest_pool.shutdown(wait=False, cancel_futures=True)
+    _ingest_pool = None
+
+async def load_all_documents(vector_db, progress=None):
+    """Sync documents from data/raw_pdfs into the vector DB.
+    
+    A manifest next to the collection records each PDF's content hash and chunk
+    ids, so only added or changed PDFs are extracted and embedded again and the
+    chunks of removed PDFs are deleted. Files whose near-duplicate chunks were
+    dropped in favour of a removed or changed file are ingested again so that
+    content is not lost. ``progress`` (e.g. a ``ReloadJob``) is
+    told about each finished file and error.
+    """
     try:
         data_dir = Path("data/raw_pdfs")
-        if not data_dir.exists() or not list(data_dir.glob("*.pdf")):
+        pdf_files = sorted(data_dir.glob("*.pdf")) if data_dir.exists() else []
+        manifest = load_manifest(vector_db.manifest_path)
+        files = manifest["files"]
+        
+        current = {pdf.name for pdf in pdf_files} or {SAMPLE_ENTRY}
+        removed = [n for n in files if n not in current]
+        for name in removed:
+            await vector_db.delete_documents(files.pop(name)["chunk_ids"])
+            save_manifest(vector_db.manifest_path, manifest)
+            logger.info(f"Removed chunks of deleted file {name}")
+            if progress:
+                progress.files_removed += 1
+        
+        if not pdf_files:
+            if progress:
+                progress.files_total = 1
+            if SAMPLE_ENTRY in files:
+                if progress:
+                    progress.files_skipped = 1
+                return
             logger.warning("No PDFs found, seeding with sample data.")
-            await create_sample_data(vector_db)
+            ids = await create_sample_data(vector_db)
+            files[SAMPLE_ENTRY] = {"sha256": None, "chunk_ids": ids}
+            save_manifest(vector_db.manifest_path, manifest)
+            if progress:
+                progress.record_file(SAMPLE_ENTRY, len(ids))
             return
         
-        for pdf_file in data_dir.glob("*.pdf"):
-            await load_pdf_document(pdf_file, vector_db)
+        changed = []
+        for pdf_file in pdf_files:
+            # Hashing reads the whole file; keep it off the event loop
+            digest = await asyncio.to_thread(file_hash, pdf_file)
+            entry = files.get(pdf_file.name)
+            if entry and entry.get("sha256") == digest:
+                continue
+            changed.append((pdf_file, digest))
+        
+        affected = set(removed) | {pdf_file.name for pdf_file, _ in changed}
+        for pdf_file in pdf_files:
+            entry = files.get(pdf_file.name)
+            if pdf_file.name in affected or not entry:
+                continue
+            if affected.intersection(entry.get("near_duplicate_of", [])):
+                changed.append((pdf_file, entry["sha256"]))
+        
+        if progress:
+            progress.files_total = len(changed)
+            progress.files_skipped = len(pdf_files) - len(changed)
+        logger.info(f"{len(changed)} of {len(pdf_files)} PDFs added or changed")
+        
+        await ingest_files(changed, vector_db, manifest, progress)
     except Exception as e:
         logger.error(f"Load failed: {e}")
+        if progress:
+            progress.record_error(f"Load failed: {e}")
+
+class IngestStats:
+    """Per-stage counters for one ingestion run."""
+    
+    def __init__(self, workers: int, batch_size: int):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.files_extracted = 0
+        self.pages = 0
+        self.chunks_extracted = 0
+        self.extract_cpu_sec = 0.0
+        self.near_duplicates = 0
+        self.queue_max_depth = 0
+        self.queue_full_wait_sec = 0.0
+        self.queue_empty_wait_sec = 0.0
+        self.batches = 0
+        self.docs_written = 0
+        self.write_sec = 0.0
+        self._t0 = time.perf_counter()
+        self._t1 = None
+    
+    def finish(self):
+        self._t1 = time.perf_counter()
+    
+    def to_dict(self) -> Dict:
+        wall = (self._t1 or time.perf_counter()) - self._t0
+        return {
+            "workers": self.workers,
+            "batch_size": self.batch_size,
+            "wall_sec": round(wall, 2),
+            "extract": {
+                "files": self.files_extracted,
+                "pages": self.pages,
+                "chunks": self.chunks_extracted,
+                "cpu_sec": round(self.extract_cpu_sec, 2),
+                "pages_per_sec": round(self.pages / wall, 1) if wall > 0 else 0.0,
+                "chunks_per_sec": round(self.chunks_extracted / wall, 1) if wall > 0 else 0.0
+            },
+            "dedup": {
+                "enabled": settings.ingest_dedup and DEDUP_AVAILABLE,
+                "near_duplicates_dropped": self.near_duplicates
+            },
+            "queue": {
+                "max_depth": self.queue_max_depth,
+                "producer_blocked_sec": round(self.queue_full_wait_sec, 2),
+                "writer_idle_sec": round(self.queue_empty_wait_sec, 2)
+            },
+            "write": {
+                "batches": self.batches,
+                "docs": self.docs_written,
+                "busy_sec": round(self.write_sec, 2),
+                "docs_per_sec": round(self.docs_written / self.write_sec, 1) if self.write_sec > 0 else 0.0
+            }
+        }
+
+async def ingest_files(changed: List[Tuple[Path, str]], vector_db, manifest: Dict, progress=None):
+    """Extract ``changed`` PDFs in a process pool and write their chunks in batches.
+    
+    Workers extract and chunk whole PDFs; finished files feed their chunks into
+    a bounded queue drained by a single writer, which sends fixed-size batches
+    to ``vector_db``. Chunks whose MinHash signature matches one already kept
+    in this run for the same category are dropped before they are queued. A file's manifest entry is updated only after all of its
+    chunks are written, so an interrupted run redoes it next time.
+    """
+    if not changed:
+        return
+    pool = get_ingest_pool()
+    workers = min(_ingest_workers(), len(changed))
+    stats = IngestStats(workers, settings.ingest_batch_size)
+    if progress:
+        progress.ingest = stats
+    queue: asyncio.Queue = asyncio.Queue(maxsize=settings.ingest_queue_size)
+    
+    try:
+        producer = asyncio.create_task(_extract_files(pool, changed, queue, stats, progress))
+        try:
+            await _write_chunks(queue, vector_db, manifest, stats, progress)
+        finally:
+            if not producer.done():
+                producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+    finally:
+        stats.finish()
+    logger.info(f"Ingestion finished: {stats.to_dict()}")
 
-async def load_pdf_document(pdf_path: Path, vector_db):
+async def _extract_files(pool, changed, queue: asyncio.Queue, stats: IngestStats, progress=None):
+    """Keep a small window of PDF page ranges in the pool and queue their chunks.
+    
+    Large PDFs are extracted as a chain of page-range tasks that hand the
+    chunker state to each other, so neither a worker nor the queue ever holds
+    a whole document.
+    """
+    loop = asyncio.get_running_loop()
+    pending_files = iter(changed)
+    window = stats.workers * 2
+    in_flight = {}
+    file_ids: Dict[str, List[str]] = {}
+    dup_sources: Dict[str, set] = {}
+    
+    # One index per category: search filters on category, so a chunk must
+    # only give way to a near-duplicate that the same filter still finds
+    dedup_enabled = settings.ingest_dedup and DEDUP_AVAILABLE
+    dedup: Dict[str, "NearDuplicateIndex"] = {}
+    minhash_perms = settings.dedup_num_perm if dedup_enabled else 0
+    
+    def submit(pdf_file, digest, first_page=0, chunker=None):
+        future = loop.run_in_executor(
+            pool, extract_pdf_chunks, str(pdf_file), first_page, chunker,
+            settings.ingest_pages_per_task, minhash_perms
+        )
+        in_flight[future] = (pdf_file, digest)
+    
+    def fill():
+        for pdf_file, digest in pending_files:
+            submit(pdf_file, digest)
+            if len(in_flight) >= window:
+                return
+    
     try:
-        import fitz
-        doc = fitz.open(pdf_path)
-        text = "".join([page.get_text() for page in doc])
-        doc.close()
+        fill()
+        while in_flight:
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                pdf_file, digest = in_flight.pop(future)
+                try:
+                    part = future.result()
+                except Exception as e:
+                    if isinstance(e, BrokenProcessPool):
+                        shutdown_ingest_pool(pool)  # the next reload starts fresh workers
+                    logger.error(f"PDF error {pdf_file}: {e}")
+                    if progress:
+                        progress.record_error(f"{pdf_file.name}: {e}")
+                    dup_sources.pop(pdf_file.name, None)
+                    queued = file_ids.pop(pdf_file.name, None)
+                    if queued:
+                        # Earlier parts are already on their way to the store
+                        await _put(queue, (pdf_file.name, None, None, queued), stats)
+                    continue
+                if part.next_page is not None:
+                    submit(pdf_file, digest, part.next_page, part.chunker)
+                
+                stats.pages += part.pages
+                stats.extract_cpu_sec += part.cpu_sec
+                ids = file_ids.setdefault(pdf_file.name, [])
+                sources = dup_sources.setdefault(pdf_file.name, set())
+                seen = set(ids)
+                meta = {"source": pdf_file.name, "category": part.category}
+                index = None
+                if dedup_enabled:
+                    index = dedup.get(part.category)
+                    if index is None:
+                        index = dedup[part.category] = NearDuplicateIndex(
+                            settings.dedup_num_perm, settings.dedup_bands, settings.dedup_threshold
+                        )
+                for i, (doc, chunk_id) in enumerate(zip(part.chunks, part.ids)):
+                    if chunk_id in seen:
+                        continue  # identical chunk already queued
+                    if index is not None:
+                        source = index.add_or_match(part.signatures[i], pdf_file.name)
+                        if source is not None:
+                            stats.near_duplicates += 1
+                            if source != pdf_file.name:
+                                sources.add(source)
+                            continue
+                    seen.add(chunk_id)
+                    ids.append(chunk_id)
+                    stats.chunks_extracted += 1
+                    await _put(queue, (pdf_file.name, chunk_id, doc, meta), stats)
+                
+                if part.next_page is None:
+                    stats.files_extracted += 1
+                    entry = {"sha256": digest, "chunk_ids": file_ids.pop(pdf_file.name)}
+                    sources = dup_sources.pop(pdf_file.name)
+                    if sources:
+                        entry["near_duplicate_of"] = sorted(sources)
+                    await _put(queue, (pdf_file.name, None, entry, None), stats)
+            fill()
+    except Exception as e:
+        if isinstance(e, BrokenProcessPool):
+            shutdown_ingest_pool(pool)
+        logger.error(f"Extraction stopped: {e}")
+        if progress:
+            progress.record_error(f"Extraction stopped: {e}")
+        for name, queued in file_ids.items():
+            if queued:
+                await queue.put((name, None, None, queued))
+    await queue.put(None)
+
+async def _put(queue: asyncio.Queue, item, stats: IngestStats):
+    if queue.full():
+        t0 = time.perf_counter()
+        await queue.put(item)
+        stats.queue_full_wait_sec += time.perf_counter() - t0
+    else:
+        queue.put_nowait(item)
+    stats.queue_max_depth = max(stats.queue_max_depth, queue.qsize())
+
+async def _write_chunks(queue: asyncio.Queue, vector_db, manifest: Dict, stats: IngestStats, progress=None):
+    """Single writer: batch queued chunks and record files once fully written."""
+    files = manifest["files"]
+    docs, metas, ids = [], [], []
+    batch_files, failed = set(), set()
+    closed = []  # (name, manifest entry or None, abandoned ids) waiting for their last batch
+    last_save = time.monotonic()
+    
+    async def flush():
+        if docs:
+            t0 = time.perf_counter()
+            try:
+                await vector_db.add_documents(list(docs), list(metas), list(ids))
+                stats.batches += 1
+                stats.docs_written += len(docs)
+            except Exception as e:
+                logger.error(f"Batch write failed for {sorted(batch_files)}: {e}")
+                if progress:
+                    progress.record_error(f"Batch write failed: {e}")
+                failed.update(batch_files)
+            stats.write_sec += time.perf_counter() - t0
+            docs.clear(); metas.clear(); ids.clear(); batch_files.clear()
         
-        chunks = chunk_text(text)
-        category = determine_category(pdf_path.name)
+        for name, entry, abandoned in closed:
+            old_ids = set(files.get(name, {}).get("chunk_ids", []))
+            if entry is None or name in failed:
+                # The old entry stays, so anything it does not list is unreachable
+                written = abandoned if entry is None else entry["chunk_ids"]
+                orphans = set(written) - old_ids
+                if orphans:
+                    await vector_db.delete_documents(sorted(orphans))
+                continue
+            stale = old_ids - set(entry["chunk_ids"])
+            if stale:
+                await vector_db.delete_documents(sorted(stale))
+            files[name] = entry
+            if progress:
+                progress.record_file(name, len(entry["chunk_ids"]))
+        closed.clear()
+    
+    while True:
+        if queue.empty():
+            t0 = time.perf_counter()
+            item = await queue.get()
+            stats.queue_empty_wait_sec += time.perf_counter() - t0
+        else:
+            item = queue.get_nowait()
+        if item is None:
+            break
         
-        docs, metas, ids = [], [], []
-        for i, chunk in enumerate(chunks):
-            docs.append(chunk)
-            metas.append({"source": pdf_path.name, "category": category})
-            ids.append(f"{pdf_path.stem}_{i}_{uuid.uuid4().hex[:6]}")
-            
-        await vector_db.add_documents(docs, metas, ids)
-    except Exception as e:
-        logger.error(f"PDF error {pdf_path}: {e}")
-
-def chunk_text(text, size=1000, overlap=200):
-    chunks, start = [], 0
-    while start < len(text):
-        end = start + size
-        if end < len(text):
-            idx = max(text[start:end].rfind('.'), text[start:end].rfind('।'))
-            if idx > size * 0.7: end = start + idx + 1
-        chunks.append(text[start:end].strip())
-        start = end - overlap
-    return chunks
+        name, chunk_id, payload, extra = item
+        if chunk_id is None:
+            closed.append((name, payload, extra))
+            if not docs:
+                await flush()
+        else:
+            docs.append(payload)
+            metas.append(extra)
+            ids.append(chunk_id)
+            batch_files.add(name)
+            if len(docs) >= stats.batch_size:
+                await flush()
+        
+        # Rewriting the whole manifest per file is quadratic on large corpora
+        if time.monotonic() - last_save > 2.0:
+            save_manifest(vector_db.manifest_path, manifest)
+            last_save = time.monotonic()
+    
+    await flush()
+    save_manifest(vector_db.manifest_path, manifest)
+
+class ExtractedPart(NamedTuple):
+    """Chunks from one page range of a PDF, plus what is needed to continue."""
+    chunks: List[str]
+    ids: List[str]
+    category: str
+    pages: int
+    cpu_sec: float
+    next_page: Optional[int]
+    chunker: Optional["StreamChunker"]
+    signatures: Optional[object] = None  # (len(chunks), num_perm) MinHash matrix
+
+def extract_pdf_chunks(pdf_path: str, first_page: int = 0, chunker: Optional["StreamChunker"] = None,
+                       max_pages: int = 50, minhash_perms: int = 0) -> ExtractedPart:
+    """Extract and chunk up to ``max_pages`` pages of a PDF; runs in a worker process.
+    
+    Pass the returned ``next_page`` and ``chunker`` back in to continue a long
+    document; both are None once the last page has been read. With
+    ``minhash_perms`` set, MinHash signatures of the chunks are computed here
+    too so the parent only has to look them up.
+    """
+    import fitz
+    t0 = time.process_time()
+    path = Path(pdf_path)
+    chunker = chunker or StreamChunker()
+    chunks = []
+    with fitz.open(path) as doc:
+        last_page = min(first_page + max_pages, doc.page_count)
+        for number in range(first_page, last_page):
+            chunks.extend(chunker.feed(doc[number].get_text()))
+        done = last_page >= doc.page_count
+    if done:
+        chunks.extend(chunker.close())
+    
+    return ExtractedPart(
+        chunks=chunks,
+        ids=[make_chunk_id(path.stem, chunk) for chunk in chunks],
+        category=determine_category(path.name),
+        pages=last_page - first_page,
+        cpu_sec=time.process_time() - t0,
+        next_page=None if done else last_page,
+        chunker=None if done else chunker,
+        signatures=MinHasher(minhash_perms).signatures(chunks) if minhash_perms else None
+    )
+
+def make_chunk_id(stem: str, chunk: str) -> str:
+    """Deterministic chunk id derived from the source name and chunk content."""
+    return f"{stem}_{hashlib.sha1(chunk.encode('utf-8')).hexdigest()[:16]}"
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_manifest(path: str) -> Dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        manifest = {}
+    manifest.setdefault("files", {})
+    return manifest
+
+def save_manifest(path: str, manifest: Dict):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+class StreamChunker:
+    """Split text into ``size``-character chunks overlapping by ``overlap``.
+    
+    Text is fed in pieces; only the unconsumed tail (the overlap plus the part
+    of the next chunk seen so far) is kept. A chunk is emitted once enough text
+    has arrived to know where it ends, so boundaries match a single pass over
+    the concatenated text. Instances are picklable, so a worker can hand the
+    state of a half-read document to the next page-range task.
+    """
+    
+    def __init__(self, size: int = 1000, overlap: int = 200):
+        self.size = size
+        self.overlap = overlap
+        self._buf = ""
+        self._base = 0   # absolute offset of _buf[0]
+        self._start = 0  # absolute offset where the next chunk starts
+    
+    def feed(self, text: str) -> List[str]:
+        self._buf += text
+        return self._drain(final=False)
+    
+    def close(self) -> List[str]:
+        return self._drain(final=True)
+    
+    def _drain(self, final: bool) -> List[str]:
+        buf, base, size = self._buf, self._base, self.size
+        total = base + len(buf)
+        chunks = []
+        while self._start < total:
+            end = self._start + size
+            if end < total:
+                lo = self._start - base
+                idx = max(buf.rfind('.', lo, lo + size), buf.rfind('।', lo, lo + size))
+                if idx >= 0 and idx - lo > size * 0.7: end = self._start + idx - lo + 1
+            elif not final:
+                break  # can't tell yet whether more text follows this chunk
+            chunks.append(buf[self._start - base:end - base].strip())
+            self._start = end - self.overlap
+        
+        cut = min(max(self._start - base, 0), len(buf))
+        self._buf, self._base = buf[cut:], base + cut
+        return chunks
+
+CATEGORY_KEYWORDS = {
+    'scheme': ['scheme', 'yojana', 'kusum'],
+    'health': ['health', 'medical'],
+    'agriculture': ['agriculture', 'krishi'],
+    'market': ['market', 'price'],
+    'civic': ['civic', 'document'],
+}
 
 def determine_category(name):
     name = name.lower()
-    if any(k in name for k in ['scheme', 'yojana', 'kusum']): return 'scheme'
-    if any(k in name for k in ['health', 'medical']): return 'health'
-    if any(k in name for k in ['agriculture', 'krishi']): return 'agriculture'
-    if any(k in name for k in ['market', 'price']): return 'market'
-    if any(k in name for k in ['civic', 'document']): return 'civic'
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        if any(k in name for k in keywords): return category
     return 'general'
 
 async def create_sample_data(vector_db):
@@ -78,5 +531,6 @@ async def create_sample_data(vector_db):
     ]
     docs = [s["content"] for s in samples]
     metas = [s["metadata"] for s in samples]
-    ids = [f"sample_{i}_{uuid.uuid4().hex[:6]}" for i in range(len(samples))]
+    ids = [make_chunk_id("sample", doc) for doc in docs]
     await vector_db.add_documents(docs, metas, ids)
+    return ids
@@ -1,52 +1,331 @@
-"""Simple in-memory vector database fallback (no ChromaDB dependency)."""
+"""Simple in-memory vector database fallback (no ChromaDB dependency).
+
+Storage is an append-only segment: a ``<base>.log`` file of compact JSON
+records (id, metadata, body location and term counts) plus a
+``<base>.<generation>.bodies`` file holding the raw document text. Writes
+only append the new data; the segment is compacted into a fresh generation
+once replaced records make up too much of it. Document bodies stay on disk
+and are read back only for the documents a search returns.
+
+In ``dense`` mode each document also gets a hashed char n-gram embedding,
+appended as raw float32 rows to ``<base>.<generation>.vectors`` and held in
+memory as one contiguous matrix, so a query is a single matrix-vector product.
+"""
+import re
+import math
+import heapq
 import logging
-from typing import List, Dict, Optional
+from collections import Counter
+from typing import List, Dict, Optional, Tuple, Set, Any
 import json
 import os
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+try:
+    import numpy as np
+    from app.database.embeddings import HashedEmbedder
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Split on whitespace and punctuation only; \w would break Devanagari words at vowel signs
+_TOKEN_SPLIT_RE = re.compile(r"[\s.,;:!?।॥()\[\]{}\"'/\-]+")
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Compact once dead body bytes exceed this share of the bodies file (and 1 MB)
+COMPACTION_RATIO = 0.5
+COMPACTION_MIN_BYTES = 1 << 20
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase and split text into index terms."""
+    return [t for t in _TOKEN_SPLIT_RE.split(text.lower()) if t]
+
+
+def _dumps(record: Dict) -> str:
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
 
 class SimpleVectorDatabase:
-    """Simple in-memory vector database using basic text search."""
+    """Simple in-memory vector database using an inverted index with BM25 ranking."""
     
-    def __init__(self, persist_path: str = "./simple_vector_db.json"):
-        """Initialize simple vector database."""
+    def __init__(self, persist_path: str = "./simple_vector_db", mode: str = "bm25", dim: int = 256):
+        """Initialize simple vector database in ``bm25`` or ``dense`` mode."""
+        if mode == "dense" and not NUMPY_AVAILABLE:
+            logger.warning("NumPy not available, using BM25 search instead of dense mode")
+            mode = "bm25"
+        self.mode = mode
         self.persist_path = persist_path
-        self.documents = []
+        self.log_path = f"{persist_path}.log"
         self.metadatas = []
         self.ids = []
         
+        # (offset, length) of each document body in the bodies file
+        self._locations: List[Tuple[int, int]] = []
+        self._generation = 0
+        self._bodies_path = None
+        self._dead_bytes = 0
+        
+        # Dense mode: row i of the matrix embeds document i (capacity grows by doubling)
+        self._embedder = HashedEmbedder(dim) if mode == "dense" else None
+        self._matrix = None
+        self._vector_rows = 0
+        
+        # Inverted index: term -> {doc index: term frequency}
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._doc_lengths: List[int] = []
+        self._total_length = 0
+        self._id_index: Dict[str, int] = {}
+        
+        # Metadata postings: (field, value) -> doc indices, plus cached row arrays for dense slices
+        self._field_postings: Dict[Tuple[str, Any], Set[int]] = {}
+        self._partition_rows: Dict[Tuple[str, Any], Any] = {}
+        
         # Load existing data if available
         self._load()
         
-        logger.info(f"Simple vector database initialized with {len(self.documents)} documents")
+        logger.info(f"Simple vector database initialized with {len(self.ids)} documents")
     
     def _load(self):
-        """Load database from disk."""
-        if os.path.exists(self.persist_path):
-            try:
-                with open(self.persist_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.documents = data.get('documents', [])
-                    self.metadatas = data.get('metadatas', [])
-                    self.ids = data.get('ids', [])
-            except Exception as e:
-                logger.warning(f"Could not load database: {e}")
-    
-    def _save(self):
-        """Save database to disk."""
+        """Load the segment log from disk; bodies are read lazily."""
+        if not os.path.exists(self.log_path):
+            self._write_segment([])
+            self._migrate_legacy()
+            return
+        
+        try:
+            latest: Dict[str, Dict] = {}
+            corrupt = False
+            with open(self.log_path, 'r', encoding='utf-8') as f:
+                header = json.loads(f.readline())
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        corrupt = True
+                        continue
+                    previous = latest.pop(record['id'], None) if record.get('deleted') else latest.get(record['id'])
+                    if previous is not None:
+                        self._dead_bytes += previous['len']
+                    if not record.get('deleted'):
+                        latest[record['id']] = record
+            
+            self._generation = header['generation']
+            self._bodies_path = self._bodies_file(self._generation)
+            for record in latest.values():
+                self._append(record['id'], record['meta'], (record['off'], record['len']), record['tf'])
+            
+            rewrite = corrupt
+            if corrupt:
+                # A write was interrupted; rewrite a clean segment so later appends stay parseable
+                logger.warning("Skipped damaged records in segment log, compacting")
+            if self._embedder and not self._load_vectors(header, list(latest.values())):
+                # Vectors missing or built with another dimension; embed every document once
+                logger.info("Building dense vectors for existing documents")
+                rewrite = True
+            
+            if rewrite:
+                self.compact()
+        except Exception as e:
+            logger.warning(f"Could not load database: {e}")
+    
+    def _migrate_legacy(self):
+        """Import a store written by the old single-file JSON format."""
+        legacy_path = f"{self.persist_path}.json"
+        if not os.path.exists(legacy_path):
+            return
+        try:
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._write_records(data.get('documents', []), data.get('metadatas', []), data.get('ids', []))
+            logger.info(f"Migrated {len(self.ids)} documents from {legacy_path}")
+        except Exception as e:
+            logger.warning(f"Could not migrate legacy database: {e}")
+    
+    def _load_vectors(self, header: Dict, records: List[Dict]) -> bool:
+        """Gather the live rows of the vectors file into the in-memory matrix."""
+        path = self._vectors_file(self._generation)
+        if header.get('dim') != self._embedder.dim or not os.path.exists(path):
+            return False
+        if any('vec' not in r for r in records):
+            return False
+        raw = np.fromfile(path, dtype=np.float32).reshape(-1, self._embedder.dim)
+        self._vector_rows = raw.shape[0]
+        self._matrix = raw[[r['vec'] for r in records]] if records else None
+        return True
+    
+    def _bodies_file(self, generation: int) -> str:
+        return f"{self.persist_path}.{generation}.bodies"
+    
+    def _vectors_file(self, generation: int) -> str:
+        return f"{self.persist_path}.{generation}.vectors"
+    
+    def _write_segment(self, records: List[Tuple[str, Dict, str]], vectors=None):
+        """Write a fresh segment generation and atomically switch the log to it."""
+        old_files = [self._bodies_path, self._vectors_file(self._generation)]
+        generation = self._generation + 1
+        bodies_path = self._bodies_file(generation)
+        Path(bodies_path).parent.mkdir(parents=True, exist_ok=True)
+        
+        header = {"generation": generation}
+        if self._embedder:
+            header["dim"] = self._embedder.dim
+            if vectors is None:
+                vectors = self._embedder.embed_batch([doc for _, _, doc in records])
+            vectors.tofile(self._vectors_file(generation))
+        
+        lines = [_dumps(header)]
+        with open(bodies_path, 'wb') as bodies:
+            for i, (doc_id, metadata, doc) in enumerate(records):
+                data = doc.encode('utf-8')
+                record = {
+                    "id": doc_id, "meta": metadata, "off": bodies.tell(), "len": len(data),
+                    "tf": Counter(tokenize(doc))
+                }
+                if self._embedder:
+                    record["vec"] = i
+                lines.append(_dumps(record))
+                bodies.write(data)
+        
+        tmp_path = f"{self.log_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.log_path)
+        
+        self._generation = generation
+        self._bodies_path = bodies_path
+        self._dead_bytes = 0
+        if self._embedder:
+            self._matrix = vectors if len(records) else None
+            self._vector_rows = len(records)
+        for path in old_files:
+            if path and path not in (bodies_path, self._vectors_file(generation)) and os.path.exists(path):
+                os.remove(path)
+    
+    def _write_records(self, documents: List[str], metadatas: List[Dict], ids: List[str]):
+        """Append bodies and log records, then update the in-memory index."""
+        if not ids:
+            return
+        vectors = self._embedder.embed_batch(documents) if self._embedder else None
+        if vectors is not None:
+            with open(self._vectors_file(self._generation), 'ab') as f:
+                vectors.tofile(f)
+        
+        lines = []
+        with open(self._bodies_path, 'ab') as bodies:
+            for i, (doc_id, doc, metadata) in enumerate(zip(ids, documents, metadatas)):
+                data = doc.encode('utf-8')
+                location = (bodies.tell(), len(data))
+                bodies.write(data)
+                tf = Counter(tokenize(doc))
+                
+                # Update if exists, add if new
+                idx = self._id_index.get(doc_id)
+                if idx is not None:
+                    bodies.flush()
+                    self._unindex(idx)
+                    self._unindex_metadata(idx)
+                    self._dead_bytes += self._locations[idx][1]
+                    self.metadatas[idx] = metadata
+                    self._index_metadata(idx)
+                    self._locations[idx] = location
+                    self._index(idx, tf)
+                else:
+                    idx = self._append(doc_id, metadata, location, tf)
+                
+                record = {"id": doc_id, "meta": metadata, "off": location[0], "len": location[1], "tf": tf}
+                if vectors is not None:
+                    self._set_vector(idx, vectors[i])
+                    record["vec"] = self._vector_rows + i
+                lines.append(_dumps(record))
+        
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        if vectors is not None:
+            self._vector_rows += len(vectors)
+    
+    async def delete(self, ids: List[str]):
+        """Remove documents by id; the log records a tombstone for each."""
+        lines = []
+        for doc_id in ids:
+            idx = self._id_index.get(doc_id)
+            if idx is None:
+                continue
+            self._remove(idx)
+            lines.append(_dumps({"id": doc_id, "deleted": True}))
+        if not lines:
+            return
         try:
-            data = {
-                'documents': self.documents,
-                'metadatas': self.metadatas,
-                'ids': self.ids
-            }
-            with open(self.persist_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write("\n".join(lines) + "\n")
+            self._maybe_compact()
         except Exception as e:
             logger.error(f"Could not save database: {e}")
+        logger.info(f"Deleted {len(lines)} documents")
+    
+    def _remove(self, idx: int):
+        """Drop document ``idx`` by moving the last document into its slot."""
+        self._unindex(idx)
+        self._unindex_metadata(idx)
+        self._dead_bytes += self._locations[idx][1]
+        del self._id_index[self.ids[idx]]
+        
+        last = len(self.ids) - 1
+        if idx != last:
+            for term in set(tokenize(self._read_document(last))):
+                postings = self._postings[term]
+                postings[idx] = postings.pop(last)
+            self._unindex_metadata(last)
+            self.ids[idx] = self.ids[last]
+            self.metadatas[idx] = self.metadatas[last]
+            self._locations[idx] = self._locations[last]
+            self._doc_lengths[idx] = self._doc_lengths[last]
+            self._id_index[self.ids[idx]] = idx
+            self._index_metadata(idx)
+            if self._matrix is not None:
+                self._matrix[idx] = self._matrix[last]
+        
+        for values in (self.ids, self.metadatas, self._locations, self._doc_lengths):
+            values.pop()
+    
+    def _set_vector(self, idx: int, vector):
+        if self._matrix is None:
+            self._matrix = np.zeros((max(64, idx + 1), self._embedder.dim), dtype=np.float32)
+        elif idx >= len(self._matrix):
+            grown = np.zeros((max(idx + 1, 2 * len(self._matrix)), self._embedder.dim), dtype=np.float32)
+            grown[:len(self._matrix)] = self._matrix
+            self._matrix = grown
+        self._matrix[idx] = vector
+    
+    def _read_document(self, idx: int) -> str:
+        offset, length = self._locations[idx]
+        with open(self._bodies_path, 'rb') as f:
+            f.seek(offset)
+            return f.read(length).decode('utf-8')
+    
+    def compact(self):
+        """Rewrite the segment keeping only the live version of each document."""
+        records = [(doc_id, self.metadatas[i], self._read_document(i)) for i, doc_id in enumerate(self.ids)]
+        vectors = None
+        if self._matrix is not None and len(self._matrix) >= len(records):
+            vectors = np.ascontiguousarray(self._matrix[:len(records)])
+        self._write_segment(records, vectors)
+        offset = 0
+        for i, (_, _, doc) in enumerate(records):
+            length = len(doc.encode('utf-8'))
+            self._locations[i] = (offset, length)
+            offset += length
+        logger.info(f"Compacted database to {len(records)} documents")
+    
+    def _maybe_compact(self):
+        total = os.path.getsize(self._bodies_path)
+        if self._dead_bytes > COMPACTION_MIN_BYTES and self._dead_bytes > total * COMPACTION_RATIO:
+            self.compact()
     
     async def add_documents(
         self,
@@ -55,74 +334,254 @@ class SimpleVectorDatabase:
         ids: List[str]
     ):
         """Add documents to the database."""
-        for doc_id, doc, metadata in zip(ids, documents, metadatas):
-            # Update if exists, add if new
-            if doc_id in self.ids:
-                idx = self.ids.index(doc_id)
-                self.documents[idx] = doc
-                self.metadatas[idx] = metadata
-            else:
-                self.ids.append(doc_id)
-                self.documents.append(doc)
-                self.metadatas.append(metadata)
-        
-        self._save()
+        try:
+            self._write_records(documents, metadatas, ids)
+            self._maybe_compact()
+        except Exception as e:
+            logger.error(f"Could not save database: {e}")
         logger.info(f"Added {len(documents)} documents")
     
     async def search(
         self,
         query: str,
         n_results: int = 3,
-        language: Optional[str] = None
+        language: Optional[str] = None,
+        where: Optional[Dict] = None
     ) -> List[Dict]:
         """
         Search for relevant documents.
-        Simple keyword-based search (not semantic).
+        In ``bm25`` mode this is keyword search (not semantic) and only documents
+        that share at least one term with the query are scored; in ``dense`` mode
+        documents are ranked by cosine similarity of hashed n-gram embeddings.
+        ``where`` restricts results to matching metadata, as in Chroma.
         """
-        # Convert query to lowercase for matching
-        query_lower = query.lower()
-        query_words = set(query_lower.split())
-        
-        # Score each document
-        scored_results = []
-        for i, (doc, metadata) in enumerate(zip(self.documents, self.metadatas)):
-            # Skip if language filter doesn't match
-            if language and metadata.get('language') != language:
-                continue
-            
-            doc_lower = doc.lower()
-            doc_words = set(doc_lower.split())
-            
-            # Calculate simple word overlap score
-            overlap = len(query_words.intersection(doc_words))
-            
-            # Bonus for exact phrase match
-            if query_lower in doc_lower:
-                overlap += 10
-            
-            if overlap > 0:
-                scored_results.append({
-                    'score': overlap,
-                    'document': doc,
-                    'metadata': metadata,
-                    'id': self.ids[i]
-                })
-        
-        # Sort by score and return top N
-        scored_results.sort(key=lambda x: x['score'], reverse=True)
-        results = scored_results[:n_results]
+        where = self._combine_filter(where, language)
+        allowed = self._resolve_filter(where)
+        if self._embedder:
+            hits = self._dense_top_k(self._embedder.embed(query)[None, :], n_results, allowed, where)[0]
+        else:
+            hits = self._bm25_top_k(query, n_results, allowed)
         
+        results = [self._result(i, score) for i, score in hits]
         logger.debug(f"Search for '{query}' returned {len(results)} results")
         return results
     
+    async def search_batch(
+        self,
+        queries: List[str],
+        n_results: int = 3,
+        language: Optional[str] = None,
+        where: Optional[Dict] = None
+    ) -> List[List[Dict]]:
+        """Search several queries at once; dense mode scores them in one matrix product."""
+        where = self._combine_filter(where, language)
+        allowed = self._resolve_filter(where)
+        if self._embedder:
+            batch = self._dense_top_k(self._embedder.embed_batch(queries), n_results, allowed, where)
+        else:
+            batch = [self._bm25_top_k(q, n_results, allowed) for q in queries]
+        return [[self._result(i, score) for i, score in hits] for hits in batch]
+    
+    @staticmethod
+    def _combine_filter(where: Optional[Dict], language: Optional[str]) -> Optional[Dict]:
+        if not language:
+            return where
+        return {"$and": [where, {"language": language}]} if where else {"language": language}
+    
+    def _resolve_filter(self, where: Optional[Dict]) -> Optional[Set[int]]:
+        """Resolve a Chroma-style ``where`` filter to the set of matching doc indices.
+        
+        Supports plain equality, ``$eq``, ``$ne``, ``$in``, ``$nin``, ``$and`` and ``$or``;
+        several top-level fields are combined with AND. An empty ``$and`` or ``$or``
+        list adds no constraint. Returns None for no filter.
+        """
+        if not where:
+            return None
+        
+        def resolve(clause: Optional[Dict]) -> Set[int]:
+            # An empty clause matches everything; an empty result must stay empty
+            matched = self._resolve_filter(clause)
+            return matched if matched is not None else set(range(len(self.ids)))
+        
+        sets = []
+        for field, condition in where.items():
+            if field == "$and":
+                sets.extend(resolve(c) for c in condition)
+            elif field == "$or":
+                if condition:
+                    sets.append(set().union(*(resolve(c) for c in condition)))
+            elif isinstance(condition, dict):
+                for op, value in condition.items():
+                    if op == "$eq":
+                        sets.append(self._field_postings.get((field, value), set()))
+                    elif op in ("$in", "$nin"):
+                        matched = set().union(*(self._field_postings.get((field, v), set()) for v in value))
+                        sets.append(matched if op == "$in" else set(range(len(self.ids))) - matched)
+                    elif op == "$ne":
+                        sets.append(set(range(len(self.ids))) - self._field_postings.get((field, value), set()))
+                    else:
+                        raise ValueError(f"Unsupported filter operator: {op}")
+            else:
+                sets.append(self._field_postings.get((field, condition), set()))
+        
+        if not sets:
+            return None  # only empty $and/$or lists: nothing to filter on
+        sets.sort(key=len)
+        # Copy: the sets may be the index's own postings
+        return set(sets[0]).intersection(*sets[1:])
+    
+    def _bm25_top_k(self, query: str, n_results: int, allowed: Optional[Set[int]]) -> List[Tuple[int, float]]:
+        scores: Dict[int, float] = {}
+        n_docs = len(self.ids)
+        avg_length = self._total_length / n_docs if n_docs else 0.0
+        if allowed is not None and not allowed:
+            return []
+        
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            if allowed is None:
+                matches = postings.items()
+            elif len(allowed) < len(postings):
+                # Walk the smaller side: the filtered slice
+                matches = ((i, postings[i]) for i in allowed if i in postings)
+            else:
+                matches = ((i, tf) for i, tf in postings.items() if i in allowed)
+            for idx, tf in matches:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_lengths[idx] / avg_length)
+                scores[idx] = scores.get(idx, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+        
+        return heapq.nlargest(n_results, scores.items(), key=lambda x: x[1])
+    
+    def _dense_top_k(
+        self, queries, n_results: int, allowed: Optional[Set[int]], where: Optional[Dict] = None
+    ) -> List[List[Tuple[int, float]]]:
+        n_docs = len(self.ids)
+        if n_docs == 0 or self._matrix is None or n_results <= 0 or (allowed is not None and not allowed):
+            return [[] for _ in range(len(queries))]
+        
+        if allowed is None:
+            rows = None
+            scores = queries @ self._matrix[:n_docs].T
+        else:
+            rows = self._rows_for(allowed, where)
+            scores = queries @ self._matrix[rows].T
+        
+        k = min(n_results, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        batch = []
+        for row, candidates in zip(scores, top):
+            ordered = candidates[np.argsort(-row[candidates])]
+            batch.append([
+                (int(rows[i]) if rows is not None else int(i), float(row[i]))
+                for i in ordered if row[i] > 0
+            ])
+        return batch
+    
+    def _rows_for(self, allowed: Set[int], where: Dict):
+        """Row indices of a filtered slice; cached when the filter is a single equality."""
+        key = None
+        if len(where) == 1:
+            field, condition = next(iter(where.items()))
+            if isinstance(condition, dict) and list(condition) == ["$eq"]:
+                condition = condition["$eq"]
+            if not field.startswith("$") and isinstance(condition, (str, int, float, bool)):
+                key = (field, condition)
+        
+        rows = self._partition_rows.get(key) if key else None
+        if rows is None:
+            rows = np.fromiter(allowed, dtype=np.int64, count=len(allowed))
+            if key:
+                self._partition_rows[key] = rows
+        return rows
+    
+    def _index_metadata(self, idx: int):
+        for field, value in self.metadatas[idx].items():
+            if isinstance(value, (str, int, float, bool)):
+                self._field_postings.setdefault((field, value), set()).add(idx)
+                self._partition_rows.pop((field, value), None)
+    
+    def _unindex_metadata(self, idx: int):
+        for field, value in self.metadatas[idx].items():
+            if not isinstance(value, (str, int, float, bool)):
+                continue
+            members = self._field_postings.get((field, value))
+            if members is not None:
+                members.discard(idx)
+                self._partition_rows.pop((field, value), None)
+                if not members:
+                    del self._field_postings[(field, value)]
+    
+    def _result(self, idx: int, score: float) -> Dict:
+        return {
+            'score': round(score, 4),
+            'document': self._read_document(idx),
+            'metadata': self.metadatas[idx],
+            'id': self.ids[idx]
+        }
+    
+    def _append(self, doc_id: str, metadata: Dict, location: Tuple[int, int], tf: Dict[str, int]):
+        idx = len(self.ids)
+        self._id_index[doc_id] = idx
+        self.ids.append(doc_id)
+        self.metadatas.append(metadata)
+        self._locations.append(location)
+        self._doc_lengths.append(0)
+        self._index(idx, tf)
+        self._index_metadata(idx)
+        return idx
+    
+    def _index(self, idx: int, tf: Dict[str, int]):
+        """Add a document's term counts to the inverted index."""
+        for term, count in tf.items():
+            self._postings.setdefault(term, {})[idx] = count
+        length = sum(tf.values())
+        self._doc_lengths[idx] = length
+        self._total_length += length
+    
+    def _unindex(self, idx: int):
+        """Remove a document's terms from the inverted index before it is replaced."""
+        for term in set(tokenize(self._read_document(idx))):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(idx, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._doc_lengths[idx]
+        self._doc_lengths[idx] = 0
+    
     def count_documents(self) -> int:
         """Return the number of documents."""
-        return len(self.documents)
+        return len(self.ids)
+    
+    def drop(self):
+        """Delete every file belonging to this store."""
+        for path in (self.log_path, self._bodies_path, self._vectors_file(self._generation), f"{self.persist_path}.json"):
+            if path and os.path.exists(path):
+                os.remove(path)
+        self.metadatas = []
+        self.ids = []
+        self._locations = []
+        self._id_index = {}
+        logger.info(f"Dropped database at {self.persist_path}")
     
     def reset(self):
         """Clear all documents."""
-        self.documents = []
         self.metadatas = []
         self.ids = []
-        self._save()
+        self._locations = []
+        self._postings = {}
+        self._doc_lengths = []
+        self._total_length = 0
+        self._id_index = {}
+        self._field_postings = {}
+        self._partition_rows = {}
+        self._matrix = None
+        try:
+            self._write_segment([])
+        except Exception as e:
+            logger.error(f"Could not save database: {e}")
         logger.info("Database reset")
@@ -1,12 +1,21 @@
 """SQL database for tracking conversations and analytics."""
+import time
+import asyncio
 import logging
-from datetime import datetime
-from typing import Optional, List, Dict
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Float, select, func
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Dict, Tuple
+from sqlalchemy import (
+    Column, Integer, String, DateTime, Text, Boolean, Float, ForeignKey, Index,
+    select, update, func, event, and_, or_
+)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.config import get_settings
+from app.utils.metrics import SQL_WRITES, SQL_ROWS_WRITTEN, SQL_WRITE_LATENCY
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -34,22 +43,122 @@ class Conversation(Base):
     intent = Column(String(50), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+class ConversationRollup(Base):
+    """Conversation and call counts per hour or day bucket, language and intent.
+    
+    Updated in the same transaction as the conversation rows, so the dashboard
+    reads a number of rows bounded by the queried time range rather than the
+    size of the conversations table. A call is counted in the bucket of its
+    first turn.
+    """
+    __tablename__ = "conversation_rollups"
+    granularity = Column(String(4), primary_key=True)  # "hour" or "day"
+    bucket = Column(DateTime, primary_key=True)
+    language = Column(String(20), primary_key=True)
+    intent = Column(String(50), primary_key=True)
+    conversations = Column(Integer, nullable=False, default=0)
+    calls = Column(Integer, nullable=False, default=0)
+
+ROLLUP_GRANULARITIES = ("hour", "day")
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE, so concurrent workers can
+# bump the same rollup row without a unique-key race
+UPSERT_INSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+ROLLUP_UPSERT_ROWS = 100  # 6 parameters a row, well under SQLite's variable limit
+
+class StageTiming(Base):
+    """Duration of one pipeline stage of a conversation turn, in milliseconds.
+    
+    Language, intent and time are copied from the turn so latency reports can
+    be sliced without joining ``conversations``.
+    """
+    __tablename__ = "stage_timings"
+    id = Column(Integer, primary_key=True)
+    conversation_id = Column(Integer, ForeignKey("conversations.id"), index=True)
+    stage = Column(String(30), nullable=False)
+    duration_ms = Column(Float, nullable=False)
+    language = Column(String(20))
+    intent = Column(String(50))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (Index("ix_stage_timings_created_stage", "created_at", "stage"),)
+
 _engine = None
 _session_maker = None
 
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+def sqlite_pragmas() -> Dict[str, str]:
+    """PRAGMAs of the SQLite performance profile, from settings.
+    
+    WAL lets the analytics dashboard read while calls are being written, and
+    synchronous=NORMAL is durable in WAL mode except for the last commits
+    before a power loss.
+    """
+    synchronous = settings.sqlite_synchronous.upper()
+    if synchronous not in SYNCHRONOUS_MODES:
+        raise ValueError(f"sqlite_synchronous must be one of {SYNCHRONOUS_MODES}, got {synchronous!r}")
+    return {
+        "journal_mode": "WAL",
+        "synchronous": synchronous,
+        "mmap_size": str(int(settings.sqlite_mmap_size)),
+        "cache_size": str(-int(settings.sqlite_cache_size_kb)),  # negative = KiB
+        "busy_timeout": str(int(settings.sqlite_busy_timeout_ms)),
+        "temp_store": "MEMORY"
+    }
+
+def _apply_pragmas(pragmas: Dict[str, str]):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+    return on_connect
+
+def create_engine(url: str, sqlite_profile: Optional[bool] = None) -> AsyncEngine:
+    """Create the async engine, tuning pool and per-connection PRAGMAs for SQLite."""
+    if url.startswith("sqlite:///") and "aiosqlite" not in url:
+        url = url.replace("sqlite:///", "sqlite+aiosqlite:///")
+    if sqlite_profile is None:
+        sqlite_profile = settings.sqlite_performance_profile
+    
+    kwargs = {}
+    in_memory = url.endswith(":memory:") or url.endswith("://") or "mode=memory" in url
+    if not in_memory:
+        # aiosqlite defaults to NullPool, reconnecting (and re-running the
+        # PRAGMAs) on every checkout; in-memory databases keep their StaticPool
+        kwargs.update(
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout
+        )
+    engine = create_async_engine(url, **kwargs)
+    
+    if url.startswith("sqlite") and sqlite_profile:
+        pragmas = sqlite_pragmas()
+        if in_memory:
+            pragmas.pop("journal_mode")  # memory databases can't use WAL
+        event.listen(engine.sync_engine, "connect", _apply_pragmas(pragmas))
+    return engine
+
 async def init_database():
     """Initialize SQLite database with aiosqlite."""
     global _engine, _session_maker
     try:
-        url = settings.database_url
-        if url.startswith("sqlite:///") and "aiosqlite" not in url:
-            url = url.replace("sqlite:///", "sqlite+aiosqlite:///")
-        
-        _engine = create_async_engine(url)
+        _engine = create_engine(settings.database_url)
         _session_maker = async_sessionmaker(_engine, class_=AsyncSession, expire_on_commit=False)
         
         async with _engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+        
+        async with get_session() as session:
+            has_rollups = await session.scalar(select(ConversationRollup.bucket).limit(1))
+            has_conversations = await session.scalar(select(Conversation.id).limit(1))
+        if has_conversations and not has_rollups:
+            await rebuild_rollups()
     except Exception as e:
         logger.error(f"DB Init Error: {e}")
         raise
@@ -59,33 +168,357 @@ def get_session() -> AsyncSession:
         raise RuntimeError("DB not initialized")
     return _session_maker()
 
-async def save_conversation(caller_id, call_sid, user_query, ai_response, language, intent=None):
+class ConversationWriter:
+    """Write-behind queue that group-commits conversation rows.
+    
+    Rows are committed once ``batch_size`` have queued or ``flush_interval``
+    seconds after the first one arrived, whichever comes first, so callers no
+    longer wait on a commit per turn. When the queue is full, ``enqueue``
+    waits for room instead of dropping rows.
+    """
+    
+    def __init__(self, batch_size: int = 50, flush_interval: float = 0.5, max_queue: int = 10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        self._flush_total = 0.0
+        self._flush_max = 0.0
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+    
+    def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run())
+    
+    async def enqueue(self, row: Dict):
+        await self._queue.put(row)
+        self.enqueued += 1
+    
+    async def stop(self):
+        """Flush everything queued so far and stop the writer task."""
+        if not self.running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        logger.info(f"Conversation writer stopped: {self.stats()}")
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            row = await self._queue.get()
+            if row is None:
+                break
+            batch = [row]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    row = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        row = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if row is None:
+                    stopping = True
+                    break
+                batch.append(row)
+            await self._flush(batch)
+    
+    async def _flush(self, batch: List[Dict]):
+        t0 = time.perf_counter()
+        try:
+            async with get_session() as session:
+                await insert_conversations(session, batch)
+                await session.commit()
+            self.written += len(batch)
+            self.batches += 1
+            SQL_WRITES.labels("ok").inc()
+            SQL_ROWS_WRITTEN.inc(len(batch))
+        except Exception as e:
+            self.failed += len(batch)
+            SQL_WRITES.labels("error").inc()
+            logger.error(f"Error saving {len(batch)} conversations: {e}")
+        elapsed = time.perf_counter() - t0
+        SQL_WRITE_LATENCY.labels("batch").observe(elapsed)
+        self._flush_total += elapsed
+        self._flush_max = max(self._flush_max, elapsed)
+    
+    def stats(self) -> Dict:
+        batches = max(self.batches, 1)
+        return {
+            "running": self.running,
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "failed": self.failed,
+            "batches": self.batches,
+            "avg_batch_size": round(self.written / batches, 1),
+            "avg_flush_ms": round(self._flush_total / batches * 1000, 2),
+            "max_flush_ms": round(self._flush_max * 1000, 2)
+        }
+
+conversation_writer = ConversationWriter(
+    batch_size=settings.conversation_batch_size,
+    flush_interval=settings.conversation_flush_interval,
+    max_queue=settings.conversation_queue_size
+)
+
+async def save_conversation(caller_id, call_sid, user_query, ai_response, language, intent=None,
+                            timings: Optional[Dict[str, float]] = None):
+    """Queue a conversation turn; written directly when the writer isn't running.
+    
+    ``timings`` maps stage names to milliseconds and is stored in
+    ``stage_timings`` together with ``db_queue`` (time spent waiting for the
+    writer) and ``db_insert`` (time to insert and flush the turn's batch; the
+    commit that follows is not included).
+    """
+    row = dict(
+        call_sid=call_sid, caller_id=caller_id,
+        user_query=user_query, ai_response=ai_response,
+        language=language, intent=intent,
+        created_at=datetime.utcnow(), timings=timings
+    )
+    if conversation_writer.running:
+        await conversation_writer.enqueue(row)
+        return
+    start = time.perf_counter()
     try:
         async with get_session() as session:
-            conv = Conversation(
-                call_sid=call_sid, caller_id=caller_id,
-                user_query=user_query, ai_response=ai_response,
-                language=language, intent=intent
-            )
-            session.add(conv)
+            await insert_conversations(session, [row])
             await session.commit()
+        SQL_WRITES.labels("ok").inc()
+        SQL_ROWS_WRITTEN.inc()
     except Exception as e:
+        SQL_WRITES.labels("error").inc()
         logger.error(f"Error saving conversation: {e}")
+    finally:
+        SQL_WRITE_LATENCY.labels("direct").observe_since(start)
 
-async def get_call_stats() -> Dict:
+def _bucket(ts: datetime, granularity: str) -> datetime:
+    ts = ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0) if granularity == "day" else ts
+
+def _rollup_increments(rows: List[Dict], new_calls: set) -> Dict[Tuple, List[int]]:
+    """Sum rows into {(granularity, bucket, language, intent): [conversations, calls]}."""
+    increments: Dict[Tuple, List[int]] = {}
+    for row in rows:
+        sid = row.get("call_sid")
+        first_turn = sid in new_calls
+        if first_turn:
+            new_calls.discard(sid)
+        for granularity in ROLLUP_GRANULARITIES:
+            key = (
+                granularity, _bucket(row["created_at"], granularity),
+                row.get("language") or "unknown", row.get("intent") or "unknown"
+            )
+            counts = increments.setdefault(key, [0, 0])
+            counts[0] += 1
+            counts[1] += int(first_turn)
+    return increments
+
+async def _apply_rollups(session: AsyncSession, increments: Dict[Tuple, List[int]]):
+    insert = UPSERT_INSERTS.get(session.get_bind().dialect.name)
+    if insert is not None:
+        rows = [
+            dict(granularity=granularity, bucket=bucket, language=language, intent=intent,
+                 conversations=conversations, calls=calls)
+            for (granularity, bucket, language, intent), (conversations, calls) in increments.items()
+        ]
+        for i in range(0, len(rows), ROLLUP_UPSERT_ROWS):
+            stmt = insert(ConversationRollup).values(rows[i:i + ROLLUP_UPSERT_ROWS])
+            await session.execute(stmt.on_conflict_do_update(
+                index_elements=["granularity", "bucket", "language", "intent"],
+                set_={
+                    "conversations": ConversationRollup.conversations + stmt.excluded.conversations,
+                    "calls": ConversationRollup.calls + stmt.excluded.calls
+                }
+            ))
+        return
+    
+    # Other dialects: update, then insert the rows that did not exist yet
+    for (granularity, bucket, language, intent), (conversations, calls) in increments.items():
+        result = await session.execute(
+            update(ConversationRollup)
+            .where(
+                ConversationRollup.granularity == granularity,
+                ConversationRollup.bucket == bucket,
+                ConversationRollup.language == language,
+                ConversationRollup.intent == intent
+            )
+            .values(
+                conversations=ConversationRollup.conversations + conversations,
+                calls=ConversationRollup.calls + calls
+            )
+        )
+        if result.rowcount == 0:
+            session.add(ConversationRollup(
+                granularity=granularity, bucket=bucket, language=language, intent=intent,
+                conversations=conversations, calls=calls
+            ))
+
+async def insert_conversations(session: AsyncSession, rows: List[Dict]):
+    """Add conversation rows and fold them into the rollups; the caller commits."""
+    t0 = time.perf_counter()
+    timings = [row.pop("timings", None) for row in rows]
+    for row in rows:
+        row.setdefault("created_at", datetime.utcnow())
+    sids = {row["call_sid"] for row in rows if row.get("call_sid")}
+    seen = set()
+    if sids:
+        # Must run before the new rows are added, or autoflush would find them
+        seen = set(await session.scalars(
+            select(Conversation.call_sid).where(Conversation.call_sid.in_(sids)).distinct()
+        ))
+    conversations = [Conversation(**row) for row in rows]
+    session.add_all(conversations)
+    await _apply_rollups(session, _rollup_increments(rows, sids - seen))
+    
+    if any(timings):
+        await session.flush()  # assigns conversation ids
+        now = datetime.utcnow()
+        insert_ms = round((time.perf_counter() - t0) * 1000, 1)
+        for conv, stages in zip(conversations, timings):
+            if not stages:
+                continue
+            stages = dict(stages, db_insert=insert_ms)
+            stages["db_queue"] = round(max((now - conv.created_at).total_seconds(), 0.0) * 1000, 1)
+            session.add_all([
+                StageTiming(
+                    conversation_id=conv.id, stage=stage, duration_ms=duration,
+                    language=conv.language, intent=conv.intent, created_at=conv.created_at
+                )
+                for stage, duration in stages.items()
+            ])
+
+async def rebuild_rollups():
+    """Recompute all rollups from the conversations table (one full scan)."""
+    async with get_session() as session:
+        await session.execute(ConversationRollup.__table__.delete())
+        increments: Dict[Tuple, List[int]] = {}
+        seen = set()
+        result = await session.stream(
+            select(Conversation.call_sid, Conversation.language, Conversation.intent, Conversation.created_at)
+            .order_by(Conversation.id)
+            .execution_options(yield_per=5000)
+        )
+        async for sid, language, intent, created_at in result:
+            new_calls = set() if sid in seen else {sid}
+            seen.add(sid)
+            row = {"call_sid": sid, "language": language, "intent": intent,
+                   "created_at": created_at or datetime.utcnow()}
+            for key, (conversations, calls) in _rollup_increments([row], new_calls).items():
+                counts = increments.setdefault(key, [0, 0])
+                counts[0] += conversations
+                counts[1] += calls
+        await _apply_rollups(session, increments)
+        await session.commit()
+    logger.info(f"Rebuilt conversation rollups ({len(increments)} buckets)")
+
+async def check_database(timeout: float = 2.0) -> Dict:
+    """Run ``SELECT 1`` and report status and round-trip latency."""
+    start = time.perf_counter()
+    try:
+        async with get_session() as session:
+            await asyncio.wait_for(session.execute(select(1)), timeout)
+        return {"status": "connected", "latency_ms": round((time.perf_counter() - start) * 1000, 2)}
+    except Exception as e:
+        logger.error(f"Database health check failed: {e}")
+        return {"status": "error", "error": str(e) or type(e).__name__}
+
+async def get_stage_timings(start: datetime, end: Optional[datetime] = None) -> List[Tuple]:
+    """(stage, language, intent, duration_ms) rows recorded in [start, end)."""
+    stmt = select(StageTiming.stage, StageTiming.language, StageTiming.intent, StageTiming.duration_ms)
+    stmt = stmt.where(StageTiming.created_at >= utc_naive(start))
+    if end is not None:
+        stmt = stmt.where(StageTiming.created_at < utc_naive(end))
+    async with get_session() as session:
+        result = await session.execute(stmt)
+        return [tuple(row) for row in result]
+
+def utc_naive(ts: Optional[datetime]) -> Optional[datetime]:
+    """Convert an aware timestamp to naive UTC, as stored; naive ones are assumed UTC already."""
+    if ts is not None and ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+def _rollup_ranges(start: Optional[datetime], end: Optional[datetime]) -> List[Tuple]:
+    """Cover [start, end) at hour resolution with day buckets wherever a whole day fits.
+    
+    Returns (granularity, lo, hi) ranges; None means unbounded.
+    """
+    lo = _bucket(start, "hour") if start else None
+    hi = end
+    if hi is not None and hi != _bucket(hi, "hour"):
+        hi = _bucket(hi, "hour") + timedelta(hours=1)
+    
+    day_lo = lo if lo is None or lo == _bucket(lo, "day") else _bucket(lo, "day") + timedelta(days=1)
+    day_hi = _bucket(hi, "day") if hi is not None else None
+    if day_lo is not None and day_hi is not None and day_lo >= day_hi:
+        return [("hour", lo, hi)]
+    
+    ranges = [("day", day_lo, day_hi)]
+    if lo is not None and lo < day_lo:
+        ranges.append(("hour", lo, day_lo))
+    if hi is not None and day_hi < hi:
+        ranges.append(("hour", day_hi, hi))
+    return ranges
+
+async def get_call_stats(start: Optional[datetime] = None, end: Optional[datetime] = None) -> Dict:
+    """Call and conversation counts for [start, end), read from the rollups.
+    
+    Bounds are resolved to whole hours: the hour containing ``start`` through
+    the hour containing ``end``.
+    """
     try:
+        start, end = utc_naive(start), utc_naive(end)
+        clauses = []
+        for granularity, lo, hi in _rollup_ranges(start, end):
+            conditions = [ConversationRollup.granularity == granularity]
+            if lo is not None:
+                conditions.append(ConversationRollup.bucket >= lo)
+            if hi is not None:
+                conditions.append(ConversationRollup.bucket < hi)
+            clauses.append(and_(*conditions))
+        
+        stmt = (
+            select(
+                ConversationRollup.language, ConversationRollup.intent,
+                func.sum(ConversationRollup.conversations), func.sum(ConversationRollup.calls)
+            )
+            .where(or_(*clauses))
+            .group_by(ConversationRollup.language, ConversationRollup.intent)
+        )
         async with get_session() as session:
-            total_calls = await session.scalar(select(func.count()).select_from(Call))
-            total_convs = await session.scalar(select(func.count()).select_from(Conversation))
-            
-            lang_stmt = select(Conversation.language, func.count(Conversation.id)).group_by(Conversation.language)
-            lang_result = await session.execute(lang_stmt)
-            
-            return {
-                "total_calls": total_calls or 0,
-                "total_conversations": total_convs or 0,
-                "languages": {row[0]: row[1] for row in lang_result}
-            }
+            result = await session.execute(stmt)
+        
+        stats = {"total_calls": 0, "total_conversations": 0, "languages": {}, "intents": {}}
+        for language, intent, conversations, calls in result:
+            stats["total_calls"] += calls or 0
+            stats["total_conversations"] += conversations or 0
+            stats["languages"][language] = stats["languages"].get(language, 0) + (conversations or 0)
+            stats["intents"][intent] = stats["intents"].get(intent, 0) + (conversations or 0)
+        return stats
     except Exception as e:
         logger.error(f"Stats Error: {e}")
-        return {"total_calls": 0, "total_conversations": 0, "languages": {}}
+        return {"total_calls": 0, "total_conversations": 0, "languages": {}, "intents": {}}
@@ -1,12 +1,25 @@
 """Vector database for storing and retrieving knowledge base documents."""
 import os
+import time
+import uuid
+import asyncio
 import logging
-from typing import List, Dict, Optional
+from datetime import datetime
+from typing import List, Dict, Optional, Callable
 from app.config import get_settings
+from app.utils.executor import BoundedExecutor
+from app.utils.metrics import VECTOR_SEARCHES, VECTOR_SEARCH_LATENCY
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Chroma calls are synchronous (embedding + HNSW); keep them off the event loop
+vector_executor = BoundedExecutor(
+    "vector",
+    max_workers=settings.vector_executor_workers,
+    queue_depth=settings.vector_executor_queue_depth
+)
+
 try:
     import chromadb
     from chromadb.config import Settings as ChromaSettings
@@ -16,13 +29,42 @@ except ImportError:
     logger.warning("ChromaDB not available, using simple fallback")
     from app.database.simple_vector_db import SimpleVectorDatabase
 
+DEFAULT_COLLECTION = "vanvani_knowledge"
+SIMPLE_DB_PREFIX = "./simple_vector_db"
+
+def _active_pointer_path() -> str:
+    return os.path.join(settings.vector_db_path, "active_collection")
+
+def get_active_collection() -> str:
+    """Name of the collection currently serving queries."""
+    try:
+        with open(_active_pointer_path(), 'r', encoding='utf-8') as f:
+            return f.read().strip() or DEFAULT_COLLECTION
+    except FileNotFoundError:
+        return DEFAULT_COLLECTION
+
+def set_active_collection(name: str):
+    os.makedirs(settings.vector_db_path, exist_ok=True)
+    tmp_path = f"{_active_pointer_path()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(name)
+    os.replace(tmp_path, _active_pointer_path())
+
 class VectorDatabase:
     """Manages persistent vector storage for semantic search."""
     
-    def __init__(self):
+    def __init__(self, collection_name: Optional[str] = None):
+        self.collection_name = collection_name or get_active_collection()
+        # Source-file hashes and chunk ids used for incremental ingestion
+        self.manifest_path = os.path.join(settings.vector_db_path, f"{self.collection_name}.manifest.json")
         try:
             if not CHROMADB_AVAILABLE:
-                self.simple_db = SimpleVectorDatabase()
+                suffix = "" if self.collection_name == DEFAULT_COLLECTION else f"_{self.collection_name}"
+                self.simple_db = SimpleVectorDatabase(
+                    persist_path=f"{SIMPLE_DB_PREFIX}{suffix}",
+                    mode=settings.simple_vector_mode,
+                    dim=settings.simple_vector_dim
+                )
                 self.using_simple = True
                 return
             
@@ -33,7 +75,7 @@ class VectorDatabase:
                 settings=ChromaSettings(anonymized_telemetry=False, allow_reset=True)
             )
             self.collection = self.client.get_or_create_collection(
-                name="vanvani_knowledge",
+                name=self.collection_name,
                 metadata={"description": "VanVani AI knowledge base"}
             )
         except Exception as e:
@@ -45,18 +87,25 @@ class VectorDatabase:
             if self.using_simple:
                 await self.simple_db.add_documents(documents, metadatas, ids)
             else:
-                self.collection.add(documents=documents, metadatas=metadatas, ids=ids)
+                await vector_executor.run(self.collection.upsert, documents=documents, metadatas=metadatas, ids=ids)
         except Exception as e:
             logger.error(f"Error adding documents: {e}")
             raise
 
+    @property
+    def backend(self) -> str:
+        return "simple" if self.using_simple else "chroma"
+    
     async def search(self, query: str, top_k: int = 3, filter_metadata: Optional[Dict] = None) -> List[Dict]:
+        start = time.perf_counter()
         try:
             if self.using_simple:
-                results = await self.simple_db.search(query, n_results=top_k)
+                results = await self.simple_db.search(query, n_results=top_k, where=filter_metadata)
+                VECTOR_SEARCHES.labels(self.backend, "ok").inc()
                 return [{"content": r['document'], "metadata": r['metadata']} for r in results]
             
-            results = self.collection.query(
+            results = await vector_executor.run(
+                self.collection.query,
                 query_texts=[query],
                 n_results=top_k,
                 where=filter_metadata or None
@@ -69,10 +118,49 @@ class VectorDatabase:
                         "content": doc,
                         "metadata": results['metadatas'][0][i] if results['metadatas'] else {}
                     })
+            VECTOR_SEARCHES.labels(self.backend, "ok").inc()
             return docs
         except Exception as e:
             logger.error(f"Vector search error: {e}")
+            VECTOR_SEARCHES.labels(self.backend, "error").inc()
             return []
+        finally:
+            VECTOR_SEARCH_LATENCY.labels(self.backend).observe_since(start)
+
+    async def search_batch(self, queries: List[str], top_k: int = 3) -> List[List[Dict]]:
+        """Run several searches in one call."""
+        start = time.perf_counter()
+        try:
+            if self.using_simple:
+                batch = await self.simple_db.search_batch(queries, n_results=top_k)
+                VECTOR_SEARCHES.labels(self.backend, "ok").inc(len(queries))
+                return [[{"content": r['document'], "metadata": r['metadata']} for r in results] for results in batch]
+            
+            results = await vector_executor.run(self.collection.query, query_texts=queries, n_results=top_k)
+            VECTOR_SEARCHES.labels(self.backend, "ok").inc(len(queries))
+            return [
+                [{"content": doc, "metadata": results['metadatas'][q][i] if results['metadatas'] else {}}
+                 for i, doc in enumerate(docs)]
+                for q, docs in enumerate(results['documents'] or [])
+            ]
+        except Exception as e:
+            logger.error(f"Vector batch search error: {e}")
+            VECTOR_SEARCHES.labels(self.backend, "error").inc(len(queries))
+            return [[] for _ in queries]
+        finally:
+            VECTOR_SEARCH_LATENCY.labels(self.backend).observe_since(start)
+
+    async def delete_documents(self, ids: List[str]):
+        if not ids:
+            return
+        try:
+            if self.using_simple:
+                await self.simple_db.delete(ids)
+            else:
+                await vector_executor.run(self.collection.delete, ids=ids)
+        except Exception as e:
+            logger.error(f"Error deleting documents: {e}")
+            raise
 
     def count_documents(self) -> int:
         return self.simple_db.count_documents() if self.using_simple else self.collection.count()
@@ -81,16 +169,171 @@ class VectorDatabase:
         if self.using_simple:
             self.simple_db.reset()
         else:
-            self.client.delete_collection("vanvani_knowledge")
-            self.collection = self.client.create_collection("vanvani_knowledge")
+            self.client.delete_collection(self.collection_name)
+            self.collection = self.client.create_collection(self.collection_name)
+        self._remove_manifest()
+
+    def drop(self):
+        """Remove this collection and its storage entirely."""
+        if self.using_simple:
+            self.simple_db.drop()
+        else:
+            self.client.delete_collection(self.collection_name)
+        self._remove_manifest()
 
-async def reload_vector_db():
+    def _remove_manifest(self):
+        if os.path.exists(self.manifest_path):
+            os.remove(self.manifest_path)
+
+class ReloadJob:
+    """Progress of a background knowledge base rebuild."""
+    
+    def __init__(self):
+        self.id = uuid.uuid4().hex[:12]
+        self.status = "pending"
+        self.mode = None
+        self.collection = None
+        self.files_total = 0
+        self.files_done = 0
+        self.files_skipped = 0
+        self.files_removed = 0
+        self.docs_added = 0
+        self.errors: List[str] = []
+        self.ingest = None
+        self.started_at = datetime.utcnow()
+        self.finished_at = None
+        self._t0 = time.perf_counter()
+        self._t1 = None
+    
+    def record_file(self, name: str, docs: int):
+        self.files_done += 1
+        self.docs_added += docs
+    
+    def record_error(self, message: str):
+        self.errors.append(message)
+    
+    def finish(self, status: str):
+        self.status = status
+        self.finished_at = datetime.utcnow()
+        self._t1 = time.perf_counter()
+    
+    def to_dict(self) -> Dict:
+        elapsed = (self._t1 or time.perf_counter()) - self._t0
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "mode": self.mode,
+            "collection": self.collection,
+            "files_total": self.files_total,
+            "files_done": self.files_done,
+            "files_skipped": self.files_skipped,
+            "files_removed": self.files_removed,
+            "docs_added": self.docs_added,
+            "docs_per_sec": round(self.docs_added / elapsed, 1) if elapsed > 0 else 0.0,
+            "elapsed_sec": round(elapsed, 2),
+            "errors": self.errors,
+            "stages": self.ingest.to_dict() if self.ingest else None,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+        }
+
+_reload_jobs: Dict[str, ReloadJob] = {}
+_reload_tasks = set()
+
+def get_reload_job(job_id: str) -> Optional[ReloadJob]:
+    return _reload_jobs.get(job_id)
+
+def start_reload(
+    on_swap: Callable[["VectorDatabase"], "VectorDatabase"],
+    live_db: Optional["VectorDatabase"] = None
+) -> ReloadJob:
+    """Start a knowledge base reload in the background and return its job.
+    
+    With ``live_db`` the serving collection is updated in place from its
+    manifest (only added, changed and removed PDFs are touched). Without it a
+    blue/green rebuild runs: ``on_swap`` receives the freshly built database and
+    must return the one it replaces, which keeps serving until then and is
+    dropped afterwards.
+    """
+    if any(job.status in ("pending", "running") for job in _reload_jobs.values()):
+        raise RuntimeError("A knowledge base reload is already running")
+    
+    job = ReloadJob()
+    _reload_jobs[job.id] = job
+    for old_id in list(_reload_jobs)[:-10]:
+        del _reload_jobs[old_id]
+    
+    task = asyncio.create_task(reload_vector_db(on_swap, job, live_db))
+    _reload_tasks.add(task)
+    task.add_done_callback(_reload_tasks.discard)
+    return job
+
+async def reload_vector_db(
+    on_swap: Optional[Callable] = None,
+    job: Optional[ReloadJob] = None,
+    live_db: Optional["VectorDatabase"] = None
+):
+    """Sync or rebuild the knowledge base from the source documents."""
+    from app.database.load_data import load_all_documents
+    job = job or ReloadJob()
+    job.status = "running"
+    
+    if live_db is not None and (os.path.exists(live_db.manifest_path) or live_db.count_documents() == 0):
+        job.mode = "incremental"
+        job.collection = live_db.collection_name
+        try:
+            await load_all_documents(live_db, progress=job)
+            if on_swap:
+                on_swap(live_db)  # same database; clears cached answers
+            # Files that failed keep their old manifest entries and are retried next sync
+            job.finish("partial" if job.errors else "completed")
+            logger.info(f"Vector database synced: {job.to_dict()}")
+        except Exception as e:
+            logger.error(f"Reload Error: {e}")
+            job.record_error(str(e))
+            job.finish("failed")
+        return job
+    
+    # No manifest for pre-existing data (random chunk ids), so rebuild from scratch
+    job.mode = "full"
+    job.collection = f"{DEFAULT_COLLECTION}_{job.id}"
+    previous = get_active_collection()
+    new_db = None
+    old_db = None
     try:
-        from app.database.load_data import load_all_documents
-        db = VectorDatabase()
-        db.delete_all()
-        await load_all_documents(db)
-        logger.info("Vector database reloaded successfully")
+        new_db = VectorDatabase(collection_name=job.collection)
+        new_db.delete_all()
+        await load_all_documents(new_db, progress=job)
+        if new_db.count_documents() == 0:
+            raise RuntimeError("No documents were loaded")
+        if job.errors:
+            # Keep serving the complete collection rather than a partial rebuild
+            raise RuntimeError(f"Loading reported {len(job.errors)} error(s); keeping {previous}")
+        
+        # Swap first: the pointer must never name a collection that is not serving
+        old_db = on_swap(new_db) if on_swap else VectorDatabase(collection_name=previous)
+        set_active_collection(job.collection)
+        job.finish("completed")
+        logger.info(f"Vector database reloaded into {job.collection}: {job.to_dict()}")
     except Exception as e:
         logger.error(f"Reload Error: {e}")
-        raise
+        job.record_error(str(e))
+        job.finish("failed")
+        if on_swap and old_db is not None:
+            # Swapped but the pointer was not saved: serve the previous collection again
+            on_swap(old_db)
+        if new_db is not None:
+            try:
+                new_db.drop()
+            except Exception as drop_error:
+                logger.warning(f"Could not drop partial collection {job.collection}: {drop_error}")
+        return job
+    
+    if old_db is not None and old_db.collection_name != job.collection:
+        # Let in-flight searches on the old collection finish before dropping it
+        await asyncio.sleep(settings.reload_drain_seconds)
+        try:
+            old_db.drop()
+        except Exception as e:
+            logger.warning(f"Could not drop old collection {old_db.collection_name}: {e}")
+    return job
@@ -1,16 +1,31 @@
 """Main FastAPI application for VanVani AI."""
+import re
+import json
+import time
+import asyncio
 import logging
+from datetime import datetime
+from typing import Optional
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, Response, Form
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from twilio.twiml.voice_response import VoiceResponse, Gather
 
 from app.config import get_settings
 from app.voice_handler import VoiceHandler
-from app.database.sql_db import init_database
+from app.speech.tts import TextToSpeech, MEDIA_TYPES, is_audio
+from app.speech.http_client import speech_http
+from app.speech.phrases import get_phrase
+from app.database.sql_db import init_database, check_database, conversation_writer, utc_naive
 from app.utils.analytics import log_call
+from app.database.vector_db import vector_executor
+from app.database.load_data import shutdown_ingest_pool
+from app.utils.metrics import (
+    REGISTRY, HTTP_REQUESTS, HTTP_LATENCY, HTTP_IN_FLIGHT,
+    ACTIVE_SESSIONS, EXECUTOR_QUEUE_DEPTH, EXECUTOR_IN_FLIGHT, CONVERSATION_QUEUE_DEPTH
+)
 
 # Configure logging
 logging.basicConfig(
@@ -30,9 +45,25 @@ async def lifespan(app: FastAPI):
     """Application lifespan management."""
     logger.info("Starting VanVani AI...")
     await init_database()
+    conversation_writer.start()
+    speech_http.start()
     app.state.voice_handler = VoiceHandler()
+    app.state.tts = TextToSpeech()
+    prewarm = asyncio.create_task(app.state.tts.warm_static_prompts()) if settings.tts_prewarm else None
+    
+    # Gauges are read at scrape time
+    ACTIVE_SESSIONS.set_function(lambda: len(app.state.voice_handler.active_sessions))
+    EXECUTOR_QUEUE_DEPTH.labels("vector").set_function(lambda: vector_executor.queue_depth)
+    EXECUTOR_IN_FLIGHT.labels("vector").set_function(lambda: vector_executor.stats()["in_flight"])
+    CONVERSATION_QUEUE_DEPTH.set_function(lambda: conversation_writer.queue_depth)
     yield
     logger.info("Shutting down VanVani AI...")
+    if prewarm:
+        prewarm.cancel()
+    await speech_http.close()
+    await conversation_writer.stop()
+    vector_executor.shutdown()
+    shutdown_ingest_pool()
 
 app = FastAPI(
     title=settings.app_name,
@@ -44,17 +75,80 @@ app = FastAPI(
 # Static files for web demo
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Count requests and time them per route template, so path params don't explode label sets."""
+    start = time.perf_counter()
+    HTTP_IN_FLIGHT.inc()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_IN_FLIGHT.dec()
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        HTTP_LATENCY.labels(path).observe_since(start)
+        HTTP_REQUESTS.labels(request.method, path, status).inc()
+
 @app.get("/")
 async def root():
     return FileResponse("app/static/index.html")
 
 @app.get("/health")
-async def health_check():
-    return {
-        "status": "healthy",
+async def health_check(request: Request):
+    voice_handler = getattr(request.app.state, "voice_handler", None)
+    database = await check_database()
+    healthy = database["status"] == "connected"
+    content = {
+        "status": "healthy" if healthy else "degraded",
         "environment": settings.environment,
-        "database": "connected"
+        "database": database,
+        "load": {
+            "requests_in_flight": int(HTTP_IN_FLIGHT.labels().value),
+            "active_sessions": len(voice_handler.active_sessions) if voice_handler else 0
+        },
+        "answer_cache": voice_handler.rag_engine.answer_cache.stats() if voice_handler else None,
+        "intent_routing": voice_handler.rag_engine.llm.intent_stats if voice_handler else None,
+        "prompt_budget": voice_handler.rag_engine.llm.prompt_builder.stats() if voice_handler else None,
+        "vector_executor": vector_executor.stats(),
+        "conversation_writer": conversation_writer.stats(),
+        "sessions": await voice_handler.active_sessions.stats() if voice_handler else None,
+        "tts_cache": request.app.state.tts.cache.stats() if hasattr(request.app.state, "tts") else None,
+        "tts_providers": request.app.state.tts.providers.stats() if hasattr(request.app.state, "tts") else None,
+        "speech_http": speech_http.stats()
     }
+    return JSONResponse(status_code=200 if healthy else 503, content=content)
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# Cache keys are sha256 hex digests; anything else never names a cache file
+AUDIO_KEY_RE = re.compile(r"[0-9a-f]{64}")
+
+async def say_prompt(node, text: str, language: str):
+    """Play a fixed prompt from the TTS cache when it is ready, else let Twilio say it."""
+    tts = getattr(app.state, "tts", None)
+    cached = await tts.cached_prompt(text, language) if tts is not None and settings.host else None
+    if cached is None:
+        node.say(text, language=language)
+        return
+    key, audio_format = cached
+    node.play(f"{settings.host.rstrip('/')}/audio/{key}.{audio_format}")
+
+@app.get("/audio/{key}.{audio_format}")
+async def cached_audio(request: Request, key: str, audio_format: str):
+    """Serve synthesized prompt audio for Twilio <Play>."""
+    media_type = MEDIA_TYPES.get(audio_format)
+    if media_type is None or not AUDIO_KEY_RE.fullmatch(key):
+        return JSONResponse(status_code=404, content={"error": "Unknown audio"})
+    audio = await request.app.state.tts.cache.get(key)
+    if audio is None or not is_audio(audio, audio_format):
+        return JSONResponse(status_code=404, content={"error": "Unknown audio"})
+    return Response(content=audio, media_type=media_type, headers={"Cache-Control": "public, max-age=86400"})
 
 @app.post("/webhook/incoming-call")
 async def handle_incoming_call(request: Request, From: str = Form(...)):
@@ -63,11 +157,7 @@ async def handle_incoming_call(request: Request, From: str = Form(...)):
     await log_call(From, "incoming", "initiated")
     
     response = VoiceResponse()
-    welcome_text = (
-        "नमस्कार! मैं वनवाणी हूं। "
-        "आप गोंडी, हल्बी, छत्तीसगढ़ी, या हिंदी में बात कर सकते हैं। "
-        "कृपया अपना सवाल बोलें।"
-    )
+    welcome_text = get_phrase("welcome")
     
     gather = Gather(
         input='speech',
@@ -77,9 +167,9 @@ async def handle_incoming_call(request: Request, From: str = Form(...)):
         speechTimeout='auto',
         speechModel='phone_call'
     )
-    gather.say(welcome_text, language='hi-IN')
+    await say_prompt(gather, welcome_text, 'hi-IN')
     response.append(gather)
-    response.say("मुझे आपकी आवाज़ नहीं सुनाई दी। कृपया फिर से कोशिश करें।", language='hi-IN')
+    await say_prompt(response, get_phrase("no_input"), 'hi-IN')
     
     return Response(content=str(response), media_type="application/xml")
 
@@ -93,7 +183,7 @@ async def process_speech(
     """Process speech and generate AI response."""
     if not SpeechResult:
         response = VoiceResponse()
-        response.say("मुझे आपकी आवाज़ नहीं सुनाई दी। कृपया फिर से कोशिश करें।", language='hi-IN')
+        await say_prompt(response, get_phrase("no_input"), 'hi-IN')
         return Response(content=str(response), media_type="application/xml")
     
     try:
@@ -116,12 +206,13 @@ async def process_speech(
             timeout=5
         )
         
-        follow_up = "क्या आपको और कुछ जानकारी चाहिए?" if detected_language == 'hi-IN' else "Do you need more information?"
-        gather.say(follow_up, language=detected_language)
+        phrase_language = "hi" if detected_language == 'hi-IN' else "en"
+        follow_up = get_phrase("follow_up", phrase_language)
+        await say_prompt(gather, follow_up, detected_language)
         response.append(gather)
         
-        goodbye = "धन्यवाद! फिर से कॉल करें।" if detected_language == 'hi-IN' else "Thank you! Call again."
-        response.say(goodbye, language=detected_language)
+        goodbye = get_phrase("goodbye", phrase_language)
+        await say_prompt(response, goodbye, detected_language)
         
         await log_call(From, "processed", SpeechResult, ai_response)
         return Response(content=str(response), media_type="application/xml")
@@ -129,29 +220,67 @@ async def process_speech(
     except Exception as e:
         logger.error(f"Error processing speech: {e}")
         response = VoiceResponse()
-        response.say("क्षमा करें, कुछ समस्या हो गई है। कृपया बाद में फिर से कोशिश करें।", language='hi-IN')
+        await say_prompt(response, get_phrase("error"), 'hi-IN')
         return Response(content=str(response), media_type="application/xml")
 
+# Twilio call statuses after which the call's session can be released
+TERMINAL_CALL_STATUSES = {"completed", "busy", "failed", "no-answer", "canceled"}
+
 @app.post("/webhook/call-status")
-async def call_status(CallSid: str = Form(...), CallStatus: str = Form(...)):
+async def call_status(request: Request, CallSid: str = Form(...), CallStatus: str = Form(...)):
     logger.info(f"Call {CallSid} status: {CallStatus}")
+    if CallStatus.lower() in TERMINAL_CALL_STATUSES:
+        await request.app.state.voice_handler.end_session(CallSid)
     return {"status": "received"}
 
 @app.get("/analytics/dashboard")
-async def analytics_dashboard():
+async def analytics_dashboard(start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """Dashboard counts, optionally limited to [start, end) (ISO 8601, UTC if no offset)."""
     from app.utils.analytics import get_analytics
-    return await get_analytics()
+    # Compare in naive UTC: mixing an offset-aware and a naive bound would raise TypeError
+    start, end = utc_naive(start), utc_naive(end)
+    if start and end and start >= end:
+        return JSONResponse(status_code=400, content={"error": "start must be before end"})
+    return await get_analytics(start, end)
+
+@app.get("/analytics/latency")
+async def analytics_latency(start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """Per-stage latency percentiles by language and intent (default: last 24 hours)."""
+    from app.utils.analytics import get_latency_report
+    start, end = utc_naive(start), utc_naive(end)
+    if start and end and start >= end:
+        return JSONResponse(status_code=400, content={"error": "start must be before end"})
+    return await get_latency_report(start, end)
 
 @app.post("/admin/reload-knowledge-base")
-async def reload_knowledge_base():
+async def reload_knowledge_base(request: Request, full: bool = False):
+    """Sync the knowledge base in the background.
+    
+    By default only added, changed or removed PDFs are processed in place;
+    ``full=true`` rebuilds a new index that is swapped in when ready.
+    """
     try:
-        from app.database.vector_db import reload_vector_db
-        await reload_vector_db()
-        return {"status": "success", "message": "Knowledge base reloaded"}
+        from app.database.vector_db import start_reload
+        rag_engine = request.app.state.voice_handler.rag_engine
+        job = start_reload(
+            on_swap=rag_engine.swap_vector_db,
+            live_db=None if full else rag_engine.vector_db
+        )
+        return JSONResponse(status_code=202, content={"status": "accepted", "job": job.to_dict()})
+    except RuntimeError as e:
+        return JSONResponse(status_code=409, content={"error": str(e)})
     except Exception as e:
         logger.error(f"Error reloading knowledge base: {e}")
         return JSONResponse(status_code=500, content={"error": str(e)})
 
+@app.get("/admin/reload-knowledge-base/{job_id}")
+async def reload_knowledge_base_status(job_id: str):
+    from app.database.vector_db import get_reload_job
+    job = get_reload_job(job_id)
+    if not job:
+        return JSONResponse(status_code=404, content={"error": "Unknown reload job"})
+    return job.to_dict()
+
 @app.post("/api/web-chat")
 async def web_chat(request: WebChatRequest, req: Request):
     """Handle web interface chat."""
@@ -168,6 +297,31 @@ async def web_chat(request: WebChatRequest, req: Request):
         logger.error(f"Web chat error: {e}")
         return JSONResponse(status_code=500, content={"error": str(e)})
 
+@app.post("/api/web-chat/stream")
+async def web_chat_stream(request: WebChatRequest, req: Request):
+    """Stream the web chat answer as Server-Sent Events, one sentence per event."""
+    voice_handler = req.app.state.voice_handler
+    
+    async def event_stream():
+        try:
+            async for event in voice_handler.stream_query(
+                user_input=request.message,
+                caller_id="WEB_USER",
+                call_sid=request.sessionId,
+                language=request.language
+            ):
+                name = event.pop("event")
+                yield f"event: {name}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+        except Exception as e:
+            logger.error(f"Web chat stream error: {e}")
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=settings.debug)
@@ -1,11 +1,13 @@
 """Plivo voice call handler for VanVani AI."""
 import logging
-from typing import Dict, Optional
+from typing import Optional
 from plivo import plivoxml
 from app.config import get_settings
 from app.ai.rag_engine import RAGEngine
 from app.utils.language import detect_language
 from app.database.sql_db import save_conversation, get_caller_history
+from app.utils.sessions import create_session_store
+from app.speech.phrases import get_phrase
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -17,10 +19,10 @@ class PlivoVoiceHandler:
     def __init__(self):
         """Initialize Plivo voice handler."""
         self.rag_engine = RAGEngine()
-        self.active_calls: Dict[str, Dict] = {}
+        self.active_calls = create_session_store("plivo")
         logger.info("PlivoVoiceHandler initialized")
     
-    def handle_incoming_call(self, call_uuid: str, from_number: str) -> str:
+    async def handle_incoming_call(self, call_uuid: str, from_number: str) -> str:
         """
         Handle incoming Plivo call.
         
@@ -35,18 +37,18 @@ class PlivoVoiceHandler:
             logger.info(f"Incoming Plivo call from {from_number}, UUID: {call_uuid}")
             
             # Initialize call session
-            self.active_calls[call_uuid] = {
+            await self.active_calls.set(call_uuid, {
                 'from': from_number,
                 'language': 'hi',  # Default to Hindi
                 'conversation_history': []
-            }
+            })
             
             # Create Plivo XML response
             response = plivoxml.ResponseElement()
             
             # Welcome message in Hindi
             speak = plivoxml.SpeakElement(
-                "नमस्ते! VanVani AI में आपका स्वागत है। आप किसी भी सरकारी योजना, स्वास्थ्य, कृषि या अन्य जानकारी के बारे में पूछ सकते हैं।",
+                get_phrase("plivo_welcome"),
                 voice='Polly.Aditi',
                 language='hi-IN'
             )
@@ -65,7 +67,7 @@ class PlivoVoiceHandler:
             
             # Prompt for question
             prompt_speak = plivoxml.SpeakElement(
-                "कृपया अपना सवाल पूछें।",
+                get_phrase("plivo_ask_question"),
                 voice='Polly.Aditi',
                 language='hi-IN'
             )
@@ -84,7 +86,7 @@ class PlivoVoiceHandler:
             # Error response
             response = plivoxml.ResponseElement()
             error_speak = plivoxml.SpeakElement(
-                "क्षमा करें, कुछ गलत हो गया। कृपया फिर से कोशिश करें।",
+                get_phrase("plivo_error"),
                 voice='Polly.Aditi',
                 language='hi-IN'
             )
@@ -115,7 +117,7 @@ class PlivoVoiceHandler:
             logger.info(f"Processing speech for call {call_uuid}: {speech_input}")
             
             # Get call session
-            call_data = self.active_calls.get(call_uuid, {})
+            call_data = await self.active_calls.get(call_uuid, {})
             
             # Detect language
             detected_lang = detect_language(speech_input)
@@ -141,7 +143,7 @@ class PlivoVoiceHandler:
                 'content': ai_response
             })
             
-            self.active_calls[call_uuid] = call_data
+            await self.active_calls.set(call_uuid, call_data)
             
             # Save conversation to database
             await save_conversation(
@@ -191,7 +193,7 @@ class PlivoVoiceHandler:
             )
             
             follow_up = plivoxml.SpeakElement(
-                "क्या आपका कोई और सवाल है?" if detected_lang == 'hi' else "Do you have another question?",
+                get_phrase("plivo_follow_up", "hi" if detected_lang == 'hi' else "en"),
                 voice=voice_map.get(detected_lang, 'Polly.Aditi'),
                 language=lang_map.get(detected_lang, 'hi-IN')
             )
@@ -200,7 +202,7 @@ class PlivoVoiceHandler:
             
             # Thank you and hangup if no more input
             thank_you = plivoxml.SpeakElement(
-                "धन्यवाद! VanVani AI का उपयोग करने के लिए आपका धन्यवाद।",
+                get_phrase("plivo_thank_you"),
                 voice='Polly.Aditi',
                 language='hi-IN'
             )
@@ -217,7 +219,7 @@ class PlivoVoiceHandler:
             # Error response
             response = plivoxml.ResponseElement()
             error_speak = plivoxml.SpeakElement(
-                "क्षमा करें, मुझे जवाब देने में समस्या हो रही है। कृपया फिर से कोशिश करें।",
+                get_phrase("plivo_answer_error"),
                 voice='Polly.Aditi',
                 language='hi-IN'
             )
@@ -227,7 +229,7 @@ class PlivoVoiceHandler:
             
             return response.to_string()
     
-    def handle_call_status(self, call_uuid: str, status: str):
+    async def handle_call_status(self, call_uuid: str, status: str):
         """
         Handle call status updates.
         
@@ -239,8 +241,7 @@ class PlivoVoiceHandler:
             logger.info(f"Call {call_uuid} status: {status}")
             
             # Clean up call session
-            if call_uuid in self.active_calls:
-                del self.active_calls[call_uuid]
+            await self.active_calls.pop(call_uuid)
             
         except Exception as e:
             logger.error(f"Error handling call status: {str(e)}")
@@ -0,0 +1,178 @@
+"""Content-addressed cache of synthesized speech."""
+import os
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from app.utils.metrics import TTS_CACHE
+
+logger = logging.getLogger(__name__)
+
+
+class AudioCache:
+    """Two-level LRU cache of TTS audio: a bounded in-memory map over a bounded directory.
+
+    Entries are keyed by a hash of everything that changes the audio, so a
+    file name is enough to find and verify an entry. Pinned entries, such as
+    the fixed call prompts, stay in memory and are never evicted from it; they
+    still count towards the memory size. Disk recency comes from file mtimes,
+    which are refreshed on every hit, so LRU order survives restarts.
+    """
+
+    def __init__(self, directory: str, max_disk_bytes: int = 256 * 1024 * 1024,
+                 max_memory_bytes: int = 32 * 1024 * 1024):
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_bytes = max_memory_bytes
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._pinned = set()
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+        self.evictions = 0
+        self._load_index()
+
+    @staticmethod
+    def make_key(text: str, language_code: str, voice: str, audio_format: str) -> str:
+        payload = "\x1f".join((text.strip(), language_code, voice.upper(), audio_format))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.audio")
+
+    def _load_index(self):
+        """Index existing files, least recently used first."""
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(".audio") and entry.is_file():
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, entry.name[:-len(".audio")], stat.st_size))
+        for _, key, size in sorted(files):
+            self._disk[key] = size
+            self._disk_bytes += size
+        if files:
+            logger.info(f"TTS cache: {len(files)} files, {self._disk_bytes} bytes on disk")
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._memory or key in self._disk
+
+    async def get(self, key: str) -> Optional[bytes]:
+        found = await self.get_any([key])
+        return found[1] if found is not None else None
+
+    async def get_any(self, keys: List[str]) -> Optional[Tuple[str, bytes]]:
+        """Return the first cached ``(key, audio)`` among ``keys``, counted as one lookup."""
+        for key in keys:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.hits["memory"] += 1
+                TTS_CACHE.labels("memory").inc()
+                return key, audio
+
+        for key in keys:
+            if key not in self._disk:
+                continue
+            try:
+                audio = await asyncio.to_thread(self._read, key)
+            except OSError as e:
+                logger.warning(f"TTS cache read failed for {key}: {e}")
+                self._drop_disk(key, unlink=False)
+            else:
+                self._disk.move_to_end(key)
+                self._remember(key, audio)
+                self.hits["disk"] += 1
+                TTS_CACHE.labels("disk").inc()
+                return key, audio
+
+        self.misses += 1
+        TTS_CACHE.labels("miss").inc()
+        return None
+
+    async def put(self, key: str, audio: bytes, pinned: bool = False):
+        if pinned:
+            self._pinned.add(key)
+        self._remember(key, audio)
+        if not self.directory or key in self._disk:
+            return
+        try:
+            await asyncio.to_thread(self._write, key, audio)
+        except OSError as e:
+            logger.warning(f"TTS cache write failed for {key}: {e}")
+            return
+        self._disk[key] = len(audio)
+        self._disk_bytes += len(audio)
+        while self._disk_bytes > self.max_disk_bytes:
+            victim = self._oldest_unpinned(self._disk, key)
+            if victim is None:
+                break
+            self._drop_disk(victim, unlink=True)
+            self.evictions += 1
+
+    def discard(self, key: str):
+        """Forget an entry, e.g. one found to hold something other than audio."""
+        self._pinned.discard(key)
+        audio = self._memory.pop(key, None)
+        if audio is not None:
+            self._memory_bytes -= len(audio)
+        if key in self._disk:
+            self._drop_disk(key, unlink=True)
+
+    def _remember(self, key: str, audio: bytes):
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = audio
+        self._memory_bytes += len(audio)
+        while self._memory_bytes > self.max_memory_bytes:
+            victim = self._oldest_unpinned(self._memory, key)
+            if victim is None:
+                break
+            self._memory_bytes -= len(self._memory.pop(victim))
+
+    def _oldest_unpinned(self, entries: OrderedDict, keep: str) -> Optional[str]:
+        return next((k for k in entries if k not in self._pinned and k != keep), None)
+
+    def _drop_disk(self, key: str, unlink: bool):
+        self._disk_bytes -= self._disk.pop(key, 0)
+        if unlink:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def _read(self, key: str) -> bytes:
+        path = self._path(key)
+        with open(path, "rb") as f:
+            audio = f.read()
+        os.utime(path)
+        return audio
+
+    def _write(self, key: str, audio: bytes):
+        # Write then rename so readers never see a partial file
+        tmp = f"{self._path(key)}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(audio)
+        os.replace(tmp, self._path(key))
+
+    def stats(self) -> Dict:
+        lookups = sum(self.hits.values()) + self.misses
+        return {
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "pinned": len(self._pinned),
+            "disk_entries": len(self._disk),
+            "disk_bytes": self._disk_bytes,
+            "memory_hits": self.hits["memory"],
+            "disk_hits": self.hits["disk"],
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(sum(self.hits.values()) / lookups, 3) if lookups else 0.0
+        }
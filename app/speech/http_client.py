@@ -0,0 +1,115 @@
+"""Shared, pooled HTTP client for the Sarvam speech APIs."""
+import logging
+from typing import Dict, Optional
+import httpx
+from app.config import get_settings
+from app.utils.metrics import SPEECH_HTTP_CONNECTIONS, SPEECH_HTTP_IN_FLIGHT
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class SpeechHTTPClient:
+    """One ``httpx.AsyncClient`` per process, kept open for the app's lifetime.
+
+    Reusing it keeps TCP and TLS connections alive between speech calls
+    instead of paying the handshake on every request. New connections are
+    counted through httpcore's trace extension, so the ratio of requests to
+    connections shows how well the pool is reused.
+    """
+
+    def __init__(self, base_url: str, max_connections: int = 20, max_keepalive: int = 10,
+                 keepalive_expiry: float = 60.0, connect_timeout: float = 5.0, http2: bool = False):
+        self.base_url = base_url.rstrip("/")
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.connect_timeout = connect_timeout
+        self.http2 = http2 and HTTP2_AVAILABLE
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("HTTP/2 requested for speech APIs but h2 is not installed; using HTTP/1.1")
+        self._client: Optional[httpx.AsyncClient] = None
+        self.requests = 0
+        self.connections = 0
+        self.in_flight = 0
+        self.errors = 0
+
+    @property
+    def started(self) -> bool:
+        return self._client is not None and not self._client.is_closed
+
+    def start(self):
+        if self.started:
+            return
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            limits=self.limits,
+            http2=self.http2,
+            timeout=httpx.Timeout(30.0, connect=self.connect_timeout)
+        )
+        logger.info(f"Speech HTTP client started for {self.base_url} (http2={self.http2})")
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logger.info(f"Speech HTTP client closed: {self.stats()}")
+
+    async def _trace(self, event: str, info: Dict):
+        if event == "connection.connect_tcp.complete":
+            self.connections += 1
+            SPEECH_HTTP_CONNECTIONS.inc()
+
+    async def post(self, path: str, timeout: float, **kwargs) -> httpx.Response:
+        """POST to ``path`` under the base URL with a per-call read/write timeout."""
+        if not self.started:
+            # Scripts and tests that run without the app lifespan
+            self.start()
+        self.requests += 1
+        self.in_flight += 1
+        SPEECH_HTTP_IN_FLIGHT.inc()
+        try:
+            return await self._client.post(
+                path,
+                timeout=httpx.Timeout(timeout, connect=self.connect_timeout),
+                extensions={"trace": self._trace},
+                **kwargs
+            )
+        except httpx.HTTPError:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            SPEECH_HTTP_IN_FLIGHT.dec()
+
+    def stats(self) -> Dict:
+        return {
+            "base_url": self.base_url,
+            "http2": self.http2,
+            "started": self.started,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive": self.limits.max_keepalive_connections,
+            "requests": self.requests,
+            "connections_opened": self.connections,
+            "requests_per_connection": round(self.requests / self.connections, 2) if self.connections else 0.0,
+            "in_flight": self.in_flight,
+            "errors": self.errors
+        }
+
+
+speech_http = SpeechHTTPClient(
+    settings.sarvam_base_url,
+    max_connections=settings.speech_http_max_connections,
+    max_keepalive=settings.speech_http_max_keepalive,
+    keepalive_expiry=settings.speech_http_keepalive_expiry,
+    connect_timeout=settings.speech_http_connect_timeout,
+    http2=settings.speech_http2
+)
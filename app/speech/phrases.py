@@ -0,0 +1,58 @@
+"""Fixed phrases spoken by the telephony handlers.
+
+Keeping them in one place lets the TTS cache pre-synthesize every one of them
+at startup. Phrases without a translation for a language fall back to Hindi.
+"""
+from typing import Dict, Iterator, Tuple
+from app.config import get_settings
+from app.utils.language import get_language_code
+
+settings = get_settings()
+
+PHRASES: Dict[str, Dict[str, str]] = {
+    # Twilio webhooks
+    "welcome": {
+        "hi": (
+            "नमस्कार! मैं वनवाणी हूं। "
+            "आप गोंडी, हल्बी, छत्तीसगढ़ी, या हिंदी में बात कर सकते हैं। "
+            "कृपया अपना सवाल बोलें।"
+        ),
+    },
+    "no_input": {"hi": "मुझे आपकी आवाज़ नहीं सुनाई दी। कृपया फिर से कोशिश करें।"},
+    "follow_up": {"hi": "क्या आपको और कुछ जानकारी चाहिए?", "en": "Do you need more information?"},
+    "goodbye": {"hi": "धन्यवाद! फिर से कॉल करें।", "en": "Thank you! Call again."},
+    "error": {"hi": "क्षमा करें, कुछ समस्या हो गई है। कृपया बाद में फिर से कोशिश करें।"},
+    # Plivo handler
+    "plivo_welcome": {
+        "hi": "नमस्ते! VanVani AI में आपका स्वागत है। आप किसी भी सरकारी योजना, स्वास्थ्य, कृषि या अन्य जानकारी के बारे में पूछ सकते हैं।",
+    },
+    "plivo_ask_question": {"hi": "कृपया अपना सवाल पूछें।"},
+    "plivo_follow_up": {"hi": "क्या आपका कोई और सवाल है?", "en": "Do you have another question?"},
+    "plivo_thank_you": {"hi": "धन्यवाद! VanVani AI का उपयोग करने के लिए आपका धन्यवाद।"},
+    "plivo_error": {"hi": "क्षमा करें, कुछ गलत हो गया। कृपया फिर से कोशिश करें।"},
+    "plivo_answer_error": {"hi": "क्षमा करें, मुझे जवाब देने में समस्या हो रही है। कृपया फिर से कोशिश करें।"},
+    # Web and app greeting
+    "greeting": {
+        "hi": "नमस्कार! मैं वनवाणी हूं। मैं आपकी कैसे मदद कर सकती हूं?",
+        "chhattisgarhi": "नमस्कार! मैं वनवाणी हवं। मैं तोर कइसे मदद कर सकत हवं?",
+        "en": "Hello! I am VanVani. How can I help you?",
+        "gondi": "सेवा सेवा! नन्ना वनवाणी। नन्ना नीवा मदद बर्ता कीकन?",
+        "halbi": "नमस्कार! मैं वनवाणी हवे। मोक तोर कैसे मदद करना हे?"
+    },
+}
+
+
+def get_phrase(name: str, language: str = "hi") -> str:
+    variants = PHRASES[name]
+    return variants.get(language, variants["hi"])
+
+
+def iter_static_prompts() -> Iterator[Tuple[str, str]]:
+    """Yield each distinct (text, language_code) spoken for a supported language."""
+    seen = set()
+    for name in PHRASES:
+        for language in settings.supported_languages:
+            item = (get_phrase(name, language), get_language_code(language))
+            if item not in seen:
+                seen.add(item)
+                yield item
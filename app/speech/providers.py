@@ -0,0 +1,225 @@
+"""Hedged, circuit-broken calls across redundant speech providers."""
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from app.config import get_settings
+from app.utils.metrics import SPEECH_REQUESTS, SPEECH_LATENCY, SPEECH_HEDGES, SPEECH_BREAKER_OPEN
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class CircuitBreaker:
+    """Skip a provider after consecutive failures until a cool-down has passed.
+
+    After ``reset_timeout`` seconds an open breaker lets a single trial call
+    through (half-open); its success closes the breaker, its failure opens it
+    again for another cool-down.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_running = False
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.trial_running:
+            self.trial_running = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+
+    def record_failure(self) -> bool:
+        """Count a failure; returns True if it (re)opened the breaker."""
+        self.failures += 1
+        trial, self.trial_running = self.trial_running, False
+        if trial or (self.opened_at is None and self.failures >= self.failure_threshold):
+            self.opened_at = time.monotonic()
+            self.times_opened += 1
+            return True
+        return False
+
+    def release(self):
+        """Forget a trial call that was cancelled before it finished."""
+        self.trial_running = False
+
+
+class Provider:
+    """A named speech backend with its own breaker and recent latencies."""
+
+    def __init__(self, name: str, call: Callable[..., Awaitable[Any]], breaker: CircuitBreaker,
+                 window: int = 100):
+        self.name = name
+        self.call = call
+        self.breaker = breaker
+        self.latencies = deque(maxlen=window)
+
+    def p95(self) -> Optional[float]:
+        if len(self.latencies) < 20:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+
+class ProviderOrchestrator:
+    """Call providers in preference order, hedging slow calls and racing the rest.
+
+    The first healthy provider starts at once. If it has not answered within
+    its recent p95 latency (clamped to ``[min_delay, max_delay]``), or fails
+    earlier, the next healthy provider starts too. The first answer wins and
+    every other call still running is cancelled. ``None``, an exception, a
+    call over ``call_timeout`` and a call that loses a hedge after running
+    past its hedge delay count as failures; an empty transcript is a real
+    answer for a silent turn. A provider whose breaker is open is skipped
+    without being called, so an outage costs at most one hedge delay per
+    request instead of a full timeout.
+    """
+
+    def __init__(self, kind: str, providers: Sequence[Tuple[str, Callable[..., Awaitable[Any]]]],
+                 min_delay: float = 0.3, max_delay: float = 3.0, default_delay: float = 1.0,
+                 failure_threshold: int = 3, reset_timeout: float = 30.0, call_timeout: float = 8.0):
+        self.kind = kind
+        self.providers = [
+            Provider(name, call, CircuitBreaker(failure_threshold, reset_timeout))
+            for name, call in providers
+        ]
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.default_delay = default_delay
+        self.call_timeout = call_timeout
+        self.hedges = 0
+        for provider in self.providers:
+            SPEECH_BREAKER_OPEN.labels(kind, provider.name).set(0)
+
+    def hedge_delay(self, provider: Provider) -> float:
+        p95 = provider.p95()
+        if p95 is None:
+            return self.default_delay
+        return min(max(p95, self.min_delay), self.max_delay)
+
+    async def _attempt(self, provider: Provider, args: tuple, kwargs: dict) -> Any:
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(provider.call(*args, **kwargs), self.call_timeout)
+        except asyncio.CancelledError:
+            # run() decides whether a cancelled call counts against the provider
+            SPEECH_REQUESTS.labels(self.kind, provider.name, "cancelled").inc()
+            raise
+        except asyncio.TimeoutError:
+            logger.error(f"{self.kind} provider {provider.name} timed out after {self.call_timeout}s")
+            result = None
+        except Exception as e:
+            logger.error(f"{self.kind} provider {provider.name} failed: {e}")
+            result = None
+        # None means the provider failed; "" is a valid answer (a silent turn)
+        self._settle(provider, "ok" if result is not None else "error", time.perf_counter() - start)
+        return result
+
+    def _settle(self, provider: Provider, outcome: str, elapsed: float):
+        SPEECH_REQUESTS.labels(self.kind, provider.name, outcome).inc()
+        SPEECH_LATENCY.labels(self.kind, provider.name).observe(elapsed)
+        if outcome == "ok":
+            provider.latencies.append(elapsed)
+            provider.breaker.record_success()
+            SPEECH_BREAKER_OPEN.labels(self.kind, provider.name).set(0)
+        elif provider.breaker.record_failure():
+            SPEECH_BREAKER_OPEN.labels(self.kind, provider.name).set(1)
+            logger.warning(f"{self.kind} provider {provider.name} circuit opened")
+
+    async def run(self, *args, **kwargs) -> Any:
+        """Return the first provider answer, or None if all fail or are open."""
+        waiting: List[Provider] = list(self.providers)
+        running: Dict[asyncio.Task, Tuple[Provider, float]] = {}
+        answered = False
+
+        def launch_next() -> Optional[Provider]:
+            while waiting:
+                provider = waiting.pop(0)
+                if provider.breaker.allow():
+                    task = asyncio.create_task(self._attempt(provider, args, kwargs))
+                    running[task] = (provider, time.perf_counter())
+                    return provider
+            return None
+
+        newest = launch_next()
+        try:
+            while running:
+                timeout = self.hedge_delay(newest) if waiting else None
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # The newest call is slower than usual: hedge with the next provider
+                    hedged = launch_next()
+                    if hedged is not None:
+                        self.hedges += 1
+                        SPEECH_HEDGES.labels(self.kind).inc()
+                        newest = hedged
+                    continue
+                for task in done:
+                    provider, _ = running.pop(task)
+                    result = task.result()
+                    if result is not None:
+                        answered = True
+                        return result
+                    # A failed call is not worth waiting out: start the next provider now
+                    newest = launch_next() or newest
+            return None
+        finally:
+            for task, (provider, started) in running.items():
+                if task.done():
+                    continue
+                task.cancel()
+                elapsed = time.perf_counter() - started
+                if answered and elapsed >= self.hedge_delay(provider):
+                    # Lost a hedge after overrunning its delay: a hung provider
+                    # must trip its breaker, not be asked again on every request
+                    self._settle(provider, "error", elapsed)
+                else:
+                    provider.breaker.release()
+
+    def stats(self) -> Dict:
+        return {
+            "hedges": self.hedges,
+            "providers": {
+                p.name: {
+                    "breaker": p.breaker.state,
+                    "consecutive_failures": p.breaker.failures,
+                    "times_opened": p.breaker.times_opened,
+                    "p95_ms": round(p.p95() * 1000, 1) if p.p95() is not None else None,
+                    "hedge_delay_ms": round(self.hedge_delay(p) * 1000, 1)
+                }
+                for p in self.providers
+            }
+        }
+
+
+def create_orchestrator(kind: str, providers: Sequence[Tuple[str, Callable[..., Awaitable[Any]]]]) -> ProviderOrchestrator:
+    return ProviderOrchestrator(
+        kind,
+        providers,
+        min_delay=settings.speech_hedge_min_delay,
+        max_delay=settings.speech_hedge_max_delay,
+        default_delay=settings.speech_hedge_default_delay,
+        failure_threshold=settings.speech_breaker_failures,
+        reset_timeout=settings.speech_breaker_reset_seconds,
+        call_timeout=settings.speech_provider_timeout
+    )
@@ -1,8 +1,11 @@
 """Speech-to-Text module supporting multiple Indian languages."""
+import asyncio
 import logging
 from typing import Optional
 import os
 from app.config import get_settings
+from app.speech.http_client import speech_http
+from app.speech.providers import create_orchestrator
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -20,6 +23,14 @@ class SpeechToText:
             from google.cloud import speech
             self.google_client = speech.SpeechClient()
         
+        # Sarvam first; Google is hedged in when Sarvam is slow, failing or down
+        self.providers = create_orchestrator("stt", [
+            (name, call) for name, call, available in (
+                ("sarvam", self._transcribe_sarvam, self.sarvam_available),
+                ("google", self._transcribe_google, self.google_available),
+            ) if available
+        ])
+        
         logger.info(f"STT initialized - Sarvam: {self.sarvam_available}, Google: {self.google_available}")
     
     async def transcribe_audio(
@@ -38,16 +49,9 @@ class SpeechToText:
             Transcribed text or None if failed
         """
 
-        if self.sarvam_available:
-            result = await self._transcribe_sarvam(audio_data, language_hint)
-            if result:
-                return result
-        
-        # Fallback to Google Cloud Speech
-        if self.google_available:
-            result = await self._transcribe_google(audio_data, language_hint)
-            if result:
-                return result
+        result = await self.providers.run(audio_data, language_hint)
+        if result is not None:
+            return result
         
         logger.error("No STT service available or all failed")
         return None
@@ -59,8 +63,6 @@ class SpeechToText:
     ) -> Optional[str]:
         """Transcribe using Sarvam.ai API."""
         try:
-            import httpx
-            
             # Map language codes to Sarvam.ai format
             lang_map = {
                 "hi-IN": "hi",
@@ -69,27 +71,26 @@ class SpeechToText:
             
             sarvam_lang = lang_map.get(language_hint, "hi")
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "https://api.sarvam.ai/speech-to-text",
-                    headers={
-                        "Authorization": f"Bearer {settings.sarvam_api_key}",
-                        "Content-Type": "application/octet-stream"
-                    },
-                    params={"language": sarvam_lang},
-                    content=audio_data,
-                    timeout=30.0
-                )
+            response = await speech_http.post(
+                "/speech-to-text",
+                timeout=settings.sarvam_stt_timeout,
+                headers={
+                    "Authorization": f"Bearer {settings.sarvam_api_key}",
+                    "Content-Type": "application/octet-stream"
+                },
+                params={"language": sarvam_lang},
+                content=audio_data
+            )
+            
+            if response.status_code == 200:
+                result = response.json()
+                transcript = result.get("transcript", "")
+                logger.info(f"Sarvam transcription: {transcript}")
+                return transcript
+            else:
+                logger.error(f"Sarvam API error: {response.status_code}")
+                return None
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    transcript = result.get("transcript", "")
-                    logger.info(f"Sarvam transcription: {transcript}")
-                    return transcript
-                else:
-                    logger.error(f"Sarvam API error: {response.status_code}")
-                    return None
-                    
         except Exception as e:
             logger.error(f"Sarvam transcription error: {str(e)}")
             return None
@@ -116,7 +117,7 @@ class SpeechToText:
             )
             
             # Perform transcription
-            response = self.google_client.recognize(config=config, audio=audio)
+            response = await asyncio.to_thread(self.google_client.recognize, config=config, audio=audio)
             
             # Extract transcript
             for result in response.results:
@@ -124,7 +125,8 @@ class SpeechToText:
                 logger.info(f"Google transcription: {transcript}")
                 return transcript
             
-            return None
+            # No speech recognized: a valid, empty transcript
+            return ""
             
         except Exception as e:
             logger.error(f"Google transcription error: {str(e)}")
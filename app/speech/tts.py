@@ -1,12 +1,35 @@
 """Text-to-Speech module for natural voice synthesis."""
+import time
+import base64
+import asyncio
 import logging
-from typing import Optional
+import functools
+from typing import Dict, List, Optional, Tuple
 import os
 from app.config import get_settings
+from app.speech.audio_cache import AudioCache
+from app.speech.http_client import speech_http
+from app.speech.phrases import iter_static_prompts
+from app.speech.providers import create_orchestrator
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# What each provider returns. The provider and its format are part of the
+# cache key, so a hedge won by the other provider never overwrites a voice
+PROVIDER_FORMATS = {"sarvam": "wav", "google": "mp3"}
+MEDIA_TYPES = {"wav": "audio/wav", "mp3": "audio/mpeg"}
+
+
+def is_audio(audio: bytes, audio_format: str) -> bool:
+    """Check the magic bytes, so an error page or JSON body is never cached or played."""
+    if audio_format == "wav":
+        return audio[:4] == b"RIFF" and audio[8:12] == b"WAVE"
+    if audio_format == "mp3":
+        # An ID3 tag, or straight into an MPEG audio frame sync
+        return audio[:3] == b"ID3" or (len(audio) > 1 and audio[0] == 0xFF and audio[1] & 0xE0 == 0xE0)
+    return False
+
 
 class TextToSpeech:
     """Handle text-to-speech conversion in multiple languages."""
@@ -20,39 +43,146 @@ class TextToSpeech:
             from google.cloud import texttospeech
             self.google_client = texttospeech.TextToSpeechClient()
         
+        self.cache = AudioCache(
+            settings.tts_cache_dir,
+            max_disk_bytes=settings.tts_cache_disk_bytes,
+            max_memory_bytes=settings.tts_cache_memory_bytes
+        )
+        self._inflight: Dict[Tuple[str, str, str], asyncio.Future] = {}
+        
+        # Sarvam first; Google is hedged in when Sarvam is slow, failing or down
+        self.providers = create_orchestrator("tts", [
+            (name, functools.partial(self._checked, name, call)) for name, call, available in (
+                ("sarvam", self._synthesize_sarvam, self.sarvam_available),
+                ("google", self._synthesize_google, self.google_available),
+            ) if available
+        ])
+        
         logger.info(f"TTS initialized - Sarvam: {self.sarvam_available}, Google: {self.google_available}")
     
     async def synthesize_speech(
         self, 
         text: str, 
         language_code: str = "hi-IN",
-        gender: str = "FEMALE"
+        gender: str = "FEMALE",
+        pin: bool = False
     ) -> Optional[bytes]:
         """
-        Convert text to speech audio.
+        Convert text to speech audio, serving repeated text from the audio cache.
         
         Args:
             text: Text to convert
             language_code: Language code (e.g., 'hi-IN')
             gender: Voice gender ('MALE' or 'FEMALE')
+            pin: Keep the audio in memory for good (fixed prompts)
             
         Returns:
             Audio data in bytes or None if failed
         """
-
-        if self.sarvam_available:
-            result = await self._synthesize_sarvam(text, language_code, gender)
-            if result:
-                return result
+        keys = dict(self._cache_keys(text, language_code, gender))
+        found = await self.cache.get_any(list(keys))
+        if found is not None and not is_audio(found[1], keys[found[0]]):
+            # Cached before audio was checked, e.g. an error body; synthesize again
+            self.cache.discard(found[0])
+            found = None
+        if found is not None:
+            key, audio = found
+            if pin:
+                await self.cache.put(key, audio, pinned=True)
+            return audio
         
-        # Fallback to Google Cloud TTS
-        if self.google_available:
-            result = await self._synthesize_google(text, language_code, gender)
-            if result:
-                return result
+        # Concurrent requests for the same audio share one synthesis
+        request = (text.strip(), language_code, gender.upper())
+        pending = self._inflight.get(request)
+        if pending is not None:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The request doing the synthesis was cancelled; try again ourselves
+                return await self.synthesize_speech(text, language_code, gender, pin)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[request] = future
+        try:
+            provider, audio = await self._synthesize(text, language_code, gender)
+            if audio:
+                key, _ = self._cache_key(provider, text, language_code, gender)
+                await self.cache.put(key, audio, pinned=pin)
+            future.set_result(audio)
+            return audio
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        finally:
+            del self._inflight[request]
+    
+    async def cached_prompt(self, text: str, language_code: str, gender: str = "FEMALE") -> Optional[Tuple[str, str]]:
+        """Cache key and audio format of already synthesized ``text``, if any."""
+        keys = self._cache_keys(text, language_code, gender)
+        found = await self.cache.get_any([key for key, _ in keys])
+        if found is None:
+            return None
+        key, audio = found
+        audio_format = dict(keys)[key]
+        return (key, audio_format) if is_audio(audio, audio_format) else None
+    
+    def _cache_keys(self, text: str, language_code: str, gender: str) -> List[Tuple[str, str]]:
+        """Keys the audio may be cached under, in provider preference order."""
+        return [
+            self._cache_key(provider.name, text, language_code, gender)
+            for provider in self.providers.providers
+        ]
+    
+    @staticmethod
+    def _cache_key(provider: str, text: str, language_code: str, gender: str) -> Tuple[str, str]:
+        audio_format = PROVIDER_FORMATS[provider]
+        return AudioCache.make_key(text, language_code, f"{provider}:{gender}", audio_format), audio_format
+    
+    async def warm_static_prompts(self):
+        """Synthesize and pin every fixed prompt so calls never wait on them."""
+        if not (self.sarvam_available or self.google_available):
+            logger.info("TTS prewarm skipped: no TTS service configured")
+            return
+        semaphore = asyncio.Semaphore(settings.tts_prewarm_concurrency)
+        
+        async def warm(text: str, language_code: str) -> bool:
+            async with semaphore:
+                return await self.synthesize_speech(text, language_code, pin=True) is not None
+        
+        start = time.perf_counter()
+        results = await asyncio.gather(*[warm(text, code) for text, code in iter_static_prompts()])
+        logger.info(
+            f"TTS prewarm: {sum(results)}/{len(results)} prompts ready in "
+            f"{time.perf_counter() - start:.1f}s, cache {self.cache.stats()}"
+        )
+    
+    async def _synthesize(self, text: str, language_code: str, gender: str) -> Tuple[Optional[str], Optional[bytes]]:
+        result = await self.providers.run(text, language_code, gender)
+        if result:
+            return result
         
         logger.error("No TTS service available or all failed")
-        return None
+        return None, None
+    
+    async def _checked(self, name: str, call, text: str, language_code: str, gender: str) -> Optional[Tuple[str, bytes]]:
+        """Run one provider and tag its audio with the provider's name.
+        
+        Audio that is not in the provider's format counts as a failure, so the
+        orchestrator hedges to the next provider instead of caching it.
+        """
+        audio = await call(text, language_code, gender)
+        if not audio:
+            return None
+        if not is_audio(audio, PROVIDER_FORMATS[name]):
+            logger.error(f"{name} TTS returned {len(audio)} bytes that are not {PROVIDER_FORMATS[name]} audio")
+            return None
+        return name, audio
     
     async def _synthesize_sarvam(
         self, 
@@ -62,8 +192,6 @@ class TextToSpeech:
     ) -> Optional[bytes]:
         """Synthesize speech using Sarvam.ai."""
         try:
-            import httpx
-            
             # Map language codes
             lang_map = {
                 "hi-IN": "hi",
@@ -76,32 +204,36 @@ class TextToSpeech:
             
             sarvam_lang = lang_map.get(language_code, "hi")
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "https://api.sarvam.ai/text-to-speech",
-                    headers={
-                        "Authorization": f"Bearer {settings.sarvam_api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "text": text,
-                        "language": sarvam_lang,
-                        "speaker": gender.lower(),
-                        "pitch": 0,
-                        "pace": 1.0,
-                        "loudness": 1.0
-                    },
-                    timeout=30.0
-                )
+            response = await speech_http.post(
+                "/text-to-speech",
+                timeout=settings.sarvam_tts_timeout,
+                headers={
+                    "Authorization": f"Bearer {settings.sarvam_api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "text": text,
+                    "language": sarvam_lang,
+                    "speaker": gender.lower(),
+                    "pitch": 0,
+                    "pace": 1.0,
+                    "loudness": 1.0
+                }
+            )
+            
+            # Empty audio is useless to play, so it counts as a failure
+            if response.status_code == 200 and response.content:
+                audio_data = response.content
+                if "json" in response.headers.get("content-type", ""):
+                    # Base64 WAV inside a JSON envelope
+                    audios = response.json().get("audios") or [""]
+                    audio_data = base64.b64decode(audios[0])
+                logger.info(f"Sarvam TTS successful: {len(audio_data)} bytes")
+                return audio_data
+            else:
+                logger.error(f"Sarvam TTS error: {response.status_code}")
+                return None
                 
-                if response.status_code == 200:
-                    audio_data = response.content
-                    logger.info(f"Sarvam TTS successful: {len(audio_data)} bytes")
-                    return audio_data
-                else:
-                    logger.error(f"Sarvam TTS error: {response.status_code}")
-                    return None
-                    
         except Exception as e:
             logger.error(f"Sarvam TTS error: {str(e)}")
             return None
@@ -133,7 +265,8 @@ class TextToSpeech:
             )
             
             # Perform TTS
-            response = self.google_client.synthesize_speech(
+            response = await asyncio.to_thread(
+                self.google_client.synthesize_speech,
                 input=synthesis_input, 
                 voice=voice, 
                 audio_config=audio_config
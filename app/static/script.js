@@ -44,12 +44,12 @@ function initSpeechRecognition() {
     };
 }
 
-// Process Query with Backend
+// Process Query with Backend (streamed as Server-Sent Events)
 async function processQuery(text) {
     updateUIState('processing');
 
     try {
-        const response = await fetch('/api/web-chat', {
+        const response = await fetch('/api/web-chat/stream', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -61,13 +61,43 @@ async function processQuery(text) {
             })
         });
 
-        const data = await response.json();
+        if (!response.ok || !response.body) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let langCode = languageSelect.value;
+        let messageText = null;
+
+        if (synthesis.speaking) {
+            synthesis.cancel();
+        }
 
-        if (data.status === 'success') {
-            addMessage(data.response, 'assistant');
-            speakResponse(data.response, data.language);
-        } else {
-            addMessage("Sorry, something went wrong.", 'assistant');
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const { event, data } = parseServerEvent(buffer.slice(0, boundary));
+                buffer = buffer.slice(boundary + 2);
+
+                if (event === 'start') {
+                    langCode = data.language || langCode;
+                } else if (event === 'sentence') {
+                    if (!messageText) {
+                        messageText = addMessage('', 'assistant').querySelector('p');
+                    }
+                    messageText.textContent += (messageText.textContent ? ' ' : '') + data.text;
+                    chatArea.scrollTop = chatArea.scrollHeight;
+                    speakResponse(data.text, langCode, true);
+                } else if (event === 'error') {
+                    addMessage("Sorry, something went wrong.", 'assistant');
+                }
+            }
         }
 
     } catch (error) {
@@ -78,9 +108,19 @@ async function processQuery(text) {
     }
 }
 
-// Speak Response
-function speakResponse(text, langCode) {
-    if (synthesis.speaking) {
+function parseServerEvent(raw) {
+    let event = 'message';
+    let data = '';
+    for (const line of raw.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) data += line.slice(5).trim();
+    }
+    return { event, data: data ? JSON.parse(data) : {} };
+}
+
+// Speak Response (queued sentences play back to back)
+function speakResponse(text, langCode, queue = false) {
+    if (synthesis.speaking && !queue) {
         synthesis.cancel();
     }
 
@@ -143,6 +183,7 @@ function addMessage(text, sender) {
     div.innerHTML = `<p>${text}</p>`;
     chatArea.appendChild(div);
     chatArea.scrollTop = chatArea.scrollHeight;
+    return div;
 }
 
 // Event Listeners
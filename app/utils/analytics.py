@@ -1,8 +1,9 @@
 """Analytics and logging utilities."""
+import math
 import logging
-from datetime import datetime
-from typing import Dict
-from app.database.sql_db import get_call_stats
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from app.database.sql_db import get_call_stats, get_stage_timings
 
 logger = logging.getLogger(__name__)
 
@@ -17,10 +18,10 @@ async def log_call(caller_id: str, status: str, query: str = None, response: str
     }
     logger.info(f"Analytics: {log_data}")
 
-async def get_analytics() -> Dict:
+async def get_analytics(start: Optional[datetime] = None, end: Optional[datetime] = None) -> Dict:
     """Consolidate database stats into dashboard format."""
     try:
-        stats = await get_call_stats()
+        stats = await get_call_stats(start, end)
         total_calls = stats.get("total_calls", 0)
         total_convs = stats.get("total_conversations", 0)
         
@@ -28,9 +29,62 @@ async def get_analytics() -> Dict:
             "total_calls": total_calls,
             "total_convs": total_convs,
             "languages": stats.get("languages", {}),
+            "intents": stats.get("intents", {}),
             "avg_conv_per_call": round(total_convs / max(total_calls, 1), 2),
+            "range": {
+                "start": start.isoformat() if start else None,
+                "end": end.isoformat() if end else None
+            },
             "updated_at": datetime.utcnow().isoformat()
         }
     except Exception as e:
         logger.error(f"Analytics Error: {e}")
         return {"error": "Stats unavailable"}
+
+PERCENTILES = (50, 95, 99)
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+def _summarize(durations: Iterable[float]) -> Dict:
+    values = sorted(durations)
+    summary = {"count": len(values)}
+    for pct in PERCENTILES:
+        summary[f"p{pct}"] = round(percentile(values, pct), 1)
+    return summary
+
+async def get_latency_report(start: Optional[datetime] = None, end: Optional[datetime] = None) -> Dict:
+    """p50/p95/p99 per stage, overall and sliced by language and intent.
+    
+    Defaults to the last 24 hours when ``start`` is not given.
+    """
+    try:
+        start = start or datetime.utcnow() - timedelta(hours=24)
+        rows = await get_stage_timings(start, end)
+        
+        overall: Dict[str, List[float]] = {}
+        by_language: Dict[str, Dict[str, List[float]]] = {}
+        by_intent: Dict[str, Dict[str, List[float]]] = {}
+        for stage, language, intent, duration in rows:
+            overall.setdefault(stage, []).append(duration)
+            by_language.setdefault(language or "unknown", {}).setdefault(stage, []).append(duration)
+            by_intent.setdefault(intent or "unknown", {}).setdefault(stage, []).append(duration)
+        
+        return {
+            "stages": {stage: _summarize(v) for stage, v in overall.items()},
+            "by_language": {
+                lang: {stage: _summarize(v) for stage, v in stages.items()}
+                for lang, stages in by_language.items()
+            },
+            "by_intent": {
+                intent: {stage: _summarize(v) for stage, v in stages.items()}
+                for intent, stages in by_intent.items()
+            },
+            "range": {"start": start.isoformat(), "end": end.isoformat() if end else None},
+            "updated_at": datetime.utcnow().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"Latency Report Error: {e}")
+        return {"error": "Latency stats unavailable"}
@@ -0,0 +1,105 @@
+"""Bounded thread pool for blocking calls made from async handlers."""
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorSaturated(RuntimeError):
+    """Raised when a call would exceed the executor's queue depth."""
+
+
+class BoundedExecutor:
+    """Runs blocking callables off the event loop with a cap on queued work.
+
+    At most ``max_workers`` calls execute at once and at most ``queue_depth``
+    more may wait; further calls fail fast with ``ExecutorSaturated`` rather
+    than piling up behind a slow backend. Queue wait and execution time are
+    tracked separately so the pool can be sized for concurrent calls.
+    """
+
+    def __init__(self, name: str, max_workers: int = 4, queue_depth: int = 64):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue_depth = queue_depth
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._in_flight = 0
+
+        self.submitted = 0
+        self.rejected = 0
+        self.failed = 0
+        self._completed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._exec_total = 0.0
+        self._exec_max = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """Calls submitted but not yet picked up by a worker."""
+        return max(0, self._in_flight - self.max_workers)
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        if self._in_flight >= self.max_workers + self.max_queue_depth:
+            self.rejected += 1
+            raise ExecutorSaturated(f"{self.name} executor saturated ({self._in_flight} calls in flight)")
+
+        submitted_at = time.perf_counter()
+        marks = {}
+
+        def call():
+            marks["start"] = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                marks["end"] = time.perf_counter()
+
+        loop = asyncio.get_running_loop()
+        future = self._pool.submit(call)
+        self._in_flight += 1
+        self.submitted += 1
+
+        def release(done):
+            self._in_flight -= 1
+            if not done.cancelled() and done.exception() is not None:
+                self.failed += 1
+            if "end" in marks:
+                self._record(marks["start"] - submitted_at, marks["end"] - marks["start"])
+
+        def on_done(done):
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(release, done)
+
+        # Released when the worker is done, not when the caller stops waiting:
+        # a cancelled await leaves the thread running and still in flight
+        future.add_done_callback(on_done)
+        return await asyncio.wrap_future(future)
+
+    def _record(self, wait: float, execution: float):
+        self._completed += 1
+        self._wait_total += wait
+        self._exec_total += execution
+        self._wait_max = max(self._wait_max, wait)
+        self._exec_max = max(self._exec_max, execution)
+
+    def stats(self) -> Dict:
+        done = max(self._completed, 1)
+        return {
+            "workers": self.max_workers,
+            "max_queue_depth": self.max_queue_depth,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "avg_wait_ms": round(self._wait_total / done * 1000, 2),
+            "max_wait_ms": round(self._wait_max * 1000, 2),
+            "avg_exec_ms": round(self._exec_total / done * 1000, 2),
+            "max_exec_ms": round(self._exec_max * 1000, 2)
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -34,11 +34,5 @@ def get_language_code(language: str) -> str:
     return LANGUAGE_CODE_MAP.get(language, "hi-IN")
 
 def get_greeting(language: str = "hi") -> str:
-    greetings = {
-        "hi": "नमस्कार! मैं वनवाणी हूं। मैं आपकी कैसे मदद कर सकती हूं?",
-        "chhattisgarhi": "नमस्कार! मैं वनवाणी हवं। मैं तोर कइसे मदद कर सकत हवं?",
-        "en": "Hello! I am VanVani. How can I help you?",
-        "gondi": "सेवा सेवा! नन्ना वनवाणी। नन्ना नीवा मदद बर्ता कीकन?",
-        "halbi": "नमस्कार! मैं वनवाणी हवे। मोक तोर कैसे मदद करना हे?"
-    }
-    return greetings.get(language, greetings["hi"])
+    from app.speech.phrases import get_phrase
+    return get_phrase("greeting", language)
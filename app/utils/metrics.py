@@ -0,0 +1,279 @@
+"""In-process metrics exposed in the Prometheus text format."""
+import abc
+import math
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Seconds; LLM and speech calls can take tens of seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Registry:
+    """Holds metrics in registration order and renders them for scraping."""
+
+    def __init__(self):
+        self._metrics: List["_Metric"] = []
+
+    def register(self, metric: "_Metric"):
+        if any(m.name == metric.name for m in self._metrics):
+            raise ValueError(f"Duplicate metric {metric.name}")
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Metric(abc.ABC):
+    """Base for labelled metrics.
+
+    Each label combination gets one child, created on first use and kept, so
+    steady-state updates allocate nothing; hot paths can hold on to the child
+    returned by ``labels``. Updates are plain attribute arithmetic with no
+    locks: they are made from the event loop thread.
+    """
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional[Registry] = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        if registry is not None:
+            registry.register(self)
+
+    @abc.abstractmethod
+    def _new_child(self):
+        ...
+
+    def labels(self, *values):
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _default(self):
+        return self.labels()
+
+    @abc.abstractmethod
+    def samples(self) -> List[str]:
+        ...
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+            for key, child in self._children.items()
+        ]
+
+
+class _GaugeChild:
+    __slots__ = ("value", "function")
+
+    def __init__(self):
+        self.value = 0.0
+        self.function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+    def set_function(self, function: Callable[[], float]):
+        """Read the value from ``function`` at scrape time instead."""
+        self.function = function
+
+    def get(self) -> float:
+        if self.function is not None:
+            try:
+                return float(self.function())
+            except Exception:
+                return math.nan
+        return self.value
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._default().set(value)
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default().dec(amount)
+
+    def set_function(self, function: Callable[[], float]):
+        self._default().set_function(function)
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.get())}"
+            for key, child in self._children.items()
+        ]
+
+
+class _HistogramChild:
+    __slots__ = ("upper_bounds", "counts", "sum", "count")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        self.counts = [0] * (len(upper_bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.upper_bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def observe_since(self, start: float):
+        """Observe the seconds elapsed since a ``time.perf_counter()`` reading."""
+        self.observe(time.perf_counter() - start)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry: Optional[Registry] = REGISTRY):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._default().observe(value)
+
+    def observe_since(self, start: float):
+        self._default().observe_since(start)
+
+    def samples(self) -> List[str]:
+        lines = []
+        bounds = [_format_value(b) for b in self.buckets] + ["+Inf"]
+        for key, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(bounds, child.counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+# Pipeline metrics
+HTTP_REQUESTS = Counter(
+    "vanvani_http_requests_total", "HTTP requests by route and status.", ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "vanvani_http_request_duration_seconds", "Time to produce the response headers.", ["route"]
+)
+HTTP_IN_FLIGHT = Gauge("vanvani_http_requests_in_flight", "Requests currently being handled.")
+
+LLM_REQUESTS = Counter(
+    "vanvani_llm_requests_total", "LLM operations by outcome.", ["operation", "outcome"]
+)
+LLM_LATENCY = Histogram("vanvani_llm_request_duration_seconds", "LLM operation latency.", ["operation"])
+PROMPT_TOKENS = Counter(
+    "vanvani_prompt_tokens_total", "Estimated prompt tokens sent, and saved by the token budget.", ["kind"]
+)
+
+VECTOR_SEARCHES = Counter(
+    "vanvani_vector_searches_total", "Vector searches by backend and outcome.", ["backend", "outcome"]
+)
+VECTOR_SEARCH_LATENCY = Histogram(
+    "vanvani_vector_search_duration_seconds", "Vector search latency.", ["backend"]
+)
+
+SPEECH_REQUESTS = Counter(
+    "vanvani_speech_requests_total", "STT/TTS provider calls by outcome.", ["kind", "provider", "outcome"]
+)
+SPEECH_LATENCY = Histogram(
+    "vanvani_speech_request_duration_seconds", "STT/TTS provider latency.", ["kind", "provider"]
+)
+
+SQL_WRITES = Counter("vanvani_sql_writes_total", "Conversation write transactions by outcome.", ["outcome"])
+SQL_ROWS_WRITTEN = Counter("vanvani_sql_rows_written_total", "Conversation rows committed.")
+SQL_WRITE_LATENCY = Histogram(
+    "vanvani_sql_write_duration_seconds", "Conversation write transaction latency.", ["path"]
+)
+SPEECH_HEDGES = Counter("vanvani_speech_hedges_total", "Speech calls hedged to a second provider.", ["kind"])
+SPEECH_BREAKER_OPEN = Gauge(
+    "vanvani_speech_breaker_open", "1 while a speech provider's circuit breaker is open.", ["kind", "provider"]
+)
+SPEECH_HTTP_CONNECTIONS = Counter(
+    "vanvani_speech_http_connections_opened_total", "TCP connections opened to the speech APIs."
+)
+SPEECH_HTTP_IN_FLIGHT = Gauge("vanvani_speech_http_in_flight", "Speech API HTTP requests in flight.")
+TTS_CACHE = Counter("vanvani_tts_cache_lookups_total", "TTS audio cache lookups by result.", ["result"])
+
+ACTIVE_SESSIONS = Gauge("vanvani_active_sessions", "Calls and chats with in-memory session state.")
+EXECUTOR_QUEUE_DEPTH = Gauge(
+    "vanvani_executor_queue_depth", "Calls waiting for a worker in a bounded executor.", ["executor"]
+)
+EXECUTOR_IN_FLIGHT = Gauge(
+    "vanvani_executor_in_flight", "Calls queued or running in a bounded executor.", ["executor"]
+)
+CONVERSATION_QUEUE_DEPTH = Gauge(
+    "vanvani_conversation_queue_depth", "Conversation rows waiting for the write-behind writer."
+)
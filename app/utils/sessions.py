@@ -0,0 +1,332 @@
+"""Session stores for per-call conversation state.
+
+The in-memory store is private to one process. The SQLite store keeps state
+in a file shared by every worker on the host, so a call's follow-up webhook
+can land on any uvicorn worker.
+"""
+import os
+import abc
+import sys
+import json
+import time
+import sqlite3
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from app.config import get_settings
+from app.utils.executor import BoundedExecutor, ExecutorSaturated
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate deep size in bytes of the plain containers kept in a session."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set)):
+        size += sum(estimate_size(item) for item in value)
+    return size
+
+
+class SessionStore(abc.ABC):
+    """Interface for session backends: a map of session id to state with idle expiry.
+
+    Access is async so a backend can do I/O without stalling the event loop;
+    ``len()`` stays sync for the metrics gauge and may be approximate.
+    """
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    @abc.abstractmethod
+    async def get(self, key: Hashable, default: Any = None) -> Any:
+        ...
+
+    @abc.abstractmethod
+    async def set(self, key: Hashable, value: Any):
+        ...
+
+    @abc.abstractmethod
+    async def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Release a session right away, e.g. when its call completes."""
+
+    @abc.abstractmethod
+    async def clear(self):
+        ...
+
+    @abc.abstractmethod
+    async def stats(self) -> Dict:
+        ...
+
+
+class MemorySessionStore(SessionStore):
+    """LRU map of session id to state with idle expiry and a memory cap.
+
+    Every read or write refreshes an entry and moves it to the end, so entries
+    are ordered by last use and expired ones are always at the front; sweeping
+    them costs only the number of entries that actually expired. Entries are
+    also evicted from the front while the store is over ``max_entries`` or
+    ``max_bytes``.
+    """
+
+    def __init__(self, ttl: float = 120.0, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self.expired = 0
+        self.evicted = 0
+        self.ended = 0
+
+    def __len__(self) -> int:
+        self._expire(time.monotonic())
+        return len(self._entries)
+
+    def _expire(self, now: float):
+        while self._entries:
+            key, (touched, size, _) = next(iter(self._entries.items()))
+            if now - touched <= self.ttl:
+                break
+            del self._entries[key]
+            self._bytes -= size
+            self.expired += 1
+
+    async def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        self._expire(now)
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        self._entries[key] = (now, entry[1], entry[2])
+        self._entries.move_to_end(key)
+        return entry[2]
+
+    async def set(self, key: Hashable, value: Any):
+        now = time.monotonic()
+        self._expire(now)
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        size = estimate_size(value)
+        self._entries[key] = (now, size, value)
+        self._bytes += size
+
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evicted += 1
+
+    async def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return default
+        self._bytes -= entry[1]
+        self.ended += 1
+        return entry[2]
+
+    async def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    async def stats(self) -> Dict:
+        return {
+            "backend": "memory",
+            "sessions": len(self),
+            "max_entries": self.max_entries,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "ended": self.ended
+        }
+
+
+class SQLiteSessionStore(SessionStore):
+    """Session state in a SQLite file shared by all worker processes.
+
+    Values are stored as JSON, so they must be plain dicts, lists and scalars.
+    Last-use times are wall-clock so every process agrees on expiry. Expired
+    rows are skipped on read and deleted, together with any LRU overflow, by
+    a sweep that runs at most once per ``sweep_interval`` seconds per process.
+
+    Statements run one at a time on the store's own thread, so waiting on
+    another worker's write lock (up to ``busy_timeout_ms``) never blocks the
+    event loop. A read that still fails behaves as a miss, and a write or
+    release is dropped with a warning. Reads refresh the last-use time only
+    once it is ``touch_interval`` old (a tenth of the TTL by default), so most
+    turns cost one read and no write. ``len()`` is the live count as of the
+    last sweep or ``stats()`` call.
+    """
+
+    def __init__(self, path: str, namespace: str = "default", ttl: float = 120.0,
+                 max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024,
+                 sweep_interval: float = 1.0, busy_timeout_ms: int = 1000,
+                 touch_interval: Optional[float] = None, queue_depth: int = 256):
+        self.path = path
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self.touch_interval = ttl / 10 if touch_interval is None else touch_interval
+        self.expired = 0
+        self.evicted = 0
+        self.ended = 0
+        self.busy = 0
+        self._live = 0
+        self._last_sweep = 0.0
+        # One worker: statements are serialized, so the connection needs no lock
+        self._executor = BoundedExecutor(f"sessions-{namespace}", max_workers=1, queue_depth=queue_depth)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " namespace TEXT NOT NULL, key TEXT NOT NULL, touched_at REAL NOT NULL,"
+            " size INTEGER NOT NULL, value TEXT NOT NULL, PRIMARY KEY (namespace, key))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_sessions_touched ON sessions (namespace, touched_at)"
+        )
+
+    async def _run(self, work: Callable[[], Any], action: str) -> Any:
+        """Run ``work`` on the store's thread; None if the database stayed locked or the queue is full."""
+        try:
+            return await self._executor.run(work)
+        except (sqlite3.OperationalError, ExecutorSaturated) as e:
+            self.busy += 1
+            logger.warning(f"Session {action} skipped: {e}")
+            return None
+
+    def __len__(self) -> int:
+        return self._live
+
+    async def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.time()
+
+        def work():
+            row = self._conn.execute(
+                "SELECT value, touched_at FROM sessions WHERE namespace = ? AND key = ?",
+                (self.namespace, str(key))
+            ).fetchone()
+            if row is not None and self.touch_interval <= now - row[1] <= self.ttl:
+                self._conn.execute(
+                    "UPDATE sessions SET touched_at = ? WHERE namespace = ? AND key = ?",
+                    (now, self.namespace, str(key))
+                )
+            return row
+
+        row = await self._run(work, f"read for {key}")
+        if row is None or now - row[1] > self.ttl:
+            return default
+        return json.loads(row[0])
+
+    async def set(self, key: Hashable, value: Any):
+        now = time.time()
+        data = json.dumps(value, ensure_ascii=False)
+
+        def work():
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (namespace, key, touched_at, size, value) VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, str(key), now, len(data.encode("utf-8")), data)
+            )
+            if now - self._last_sweep >= self.sweep_interval:
+                self._last_sweep = now
+                self._sweep(now)
+
+        await self._run(work, f"write for {key}")
+
+    def _sweep(self, now: float):
+        """Delete expired rows, then least recently used ones while over the caps."""
+        self.expired += self._conn.execute(
+            "DELETE FROM sessions WHERE namespace = ? AND touched_at < ?",
+            (self.namespace, now - self.ttl)
+        ).rowcount
+
+        count, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM sessions WHERE namespace = ?", (self.namespace,)
+        ).fetchone()
+        self._live = count
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        excess, stale = count - self.max_entries, []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM sessions WHERE namespace = ? ORDER BY touched_at LIMIT ?",
+            (self.namespace, count - 1)
+        ).fetchall():
+            if excess <= 0 and total <= self.max_bytes:
+                break
+            stale.append((self.namespace, key))
+            excess -= 1
+            total -= size
+        self._conn.executemany("DELETE FROM sessions WHERE namespace = ? AND key = ?", stale)
+        self.evicted += len(stale)
+        self._live = count - len(stale)
+
+    async def pop(self, key: Hashable, default: Any = None) -> Any:
+        def work():
+            row = self._conn.execute(
+                "SELECT value FROM sessions WHERE namespace = ? AND key = ?", (self.namespace, str(key))
+            ).fetchone()
+            self._conn.execute("DELETE FROM sessions WHERE namespace = ? AND key = ?", (self.namespace, str(key)))
+            return row
+
+        # If this is skipped the row simply expires after the TTL
+        row = await self._run(work, f"release for {key}")
+        if row is None:
+            return default
+        self.ended += 1
+        return json.loads(row[0])
+
+    async def clear(self):
+        await self._executor.run(self._conn.execute, "DELETE FROM sessions WHERE namespace = ?", (self.namespace,))
+        self._live = 0
+
+    async def stats(self) -> Dict:
+        count, total = await self._executor.run(lambda: self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM sessions WHERE namespace = ? AND touched_at >= ?",
+            (self.namespace, time.time() - self.ttl)
+        ).fetchone())
+        self._live = count
+        return {
+            "backend": "sqlite",
+            "sessions": count,
+            "max_entries": self.max_entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "ended": self.ended,
+            "busy": self.busy
+        }
+
+    def close(self):
+        self._executor.shutdown()
+        self._conn.close()
+
+
+def create_session_store(namespace: str) -> SessionStore:
+    """Build the session store selected by ``settings.session_backend``."""
+    options = dict(
+        ttl=settings.session_timeout,
+        max_entries=settings.session_max_entries,
+        max_bytes=settings.session_max_bytes
+    )
+    backend = settings.session_backend.lower()
+    if backend == "sqlite":
+        return SQLiteSessionStore(settings.session_db_path, namespace=namespace, **options)
+    if backend != "memory":
+        logger.warning(f"Unknown session backend '{settings.session_backend}', using memory")
+    return MemorySessionStore(**options)
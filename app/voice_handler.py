@@ -1,9 +1,12 @@
 """Voice call handling and session management."""
+import time
+import asyncio
 import logging
-from typing import Tuple
+from typing import Tuple, AsyncIterator, Dict, List
 from app.ai.rag_engine import RAGEngine
 from app.utils.language import detect_language, get_language_code
 from app.database.sql_db import save_conversation
+from app.utils.sessions import create_session_store
 
 logger = logging.getLogger(__name__)
 
@@ -12,7 +15,7 @@ class VoiceHandler:
     
     def __init__(self):
         self.rag_engine = RAGEngine()
-        self.active_sessions = {}
+        self.active_sessions = create_session_store("voice")
     
     async def process_query(
         self, 
@@ -22,30 +25,27 @@ class VoiceHandler:
         language: str = None
     ) -> Tuple[str, str]:
         """Process user input and generate context-aware AI response."""
+        start = time.perf_counter()
         try:
             detected_lang = language or detect_language(user_input)
+            detect_ms = (time.perf_counter() - start) * 1000
             language_code = get_language_code(detected_lang)
             
             # Retrieve last 3 turns of context
-            history = self.active_sessions.get(call_sid, [])
+            history = await self.active_sessions.get(call_sid, [])
             
+            trace = {}
             response = await self.rag_engine.get_response(
                 query=user_input,
                 language=detected_lang,
                 context=history,
-                caller_id=caller_id
+                caller_id=caller_id,
+                trace=trace
             )
             
             # Update history and save state
-            history.append({"user": user_input, "assistant": response})
-            self.active_sessions[call_sid] = history[-3:]
-            
-            await save_conversation(
-                caller_id=caller_id,
-                call_sid=call_sid,
-                user_query=user_input,
-                ai_response=response,
-                language=detected_lang
+            await self._record_turn(
+                caller_id, call_sid, user_input, response, detected_lang, history, trace, start, detect_ms
             )
             
             return response, language_code
@@ -59,6 +59,66 @@ class VoiceHandler:
             }
             return error_messages.get(detected_lang, error_messages["hi"]), "hi-IN"
     
-    def end_session(self, call_sid: str):
-        if call_sid in self.active_sessions:
-            del self.active_sessions[call_sid]
+    async def stream_query(
+        self,
+        user_input: str,
+        caller_id: str,
+        call_sid: str,
+        language: str = None
+    ) -> AsyncIterator[Dict]:
+        """Stream the AI response as events; the turn is saved when the stream ends, even early."""
+        start = time.perf_counter()
+        detected_lang = language or detect_language(user_input)
+        detect_ms = (time.perf_counter() - start) * 1000
+        language_code = get_language_code(detected_lang)
+        yield {"event": "start", "language": language_code}
+        
+        history = await self.active_sessions.get(call_sid, [])
+        sentences = []
+        trace = {}
+        try:
+            async for sentence in self.rag_engine.stream_response(
+                query=user_input,
+                language=detected_lang,
+                context=history,
+                trace=trace
+            ):
+                sentences.append(sentence)
+                yield {"event": "sentence", "text": sentence}
+        finally:
+            # Also on disconnect or error: keep whatever the caller already heard
+            if sentences:
+                await asyncio.shield(self._record_turn(
+                    caller_id, call_sid, user_input, " ".join(sentences), detected_lang,
+                    history, trace, start, detect_ms
+                ))
+        
+        yield {"event": "done", "response": " ".join(sentences), "language": language_code}
+    
+    async def _record_turn(
+        self, caller_id: str, call_sid: str, user_input: str, response: str, language: str,
+        history: List[Dict], trace: Dict, start: float, detect_ms: float
+    ):
+        """Append the turn to the session history and save it."""
+        history.append({"user": user_input, "assistant": response})
+        await self.active_sessions.set(call_sid, history[-3:])
+        await save_conversation(
+            caller_id=caller_id,
+            call_sid=call_sid,
+            user_query=user_input,
+            ai_response=response,
+            language=language,
+            intent=trace.get("intent"),
+            timings=self._stage_timings(trace, start, detect_ms)
+        )
+    
+    @staticmethod
+    def _stage_timings(trace: Dict, start: float, detect_ms: float) -> Dict[str, float]:
+        """Stage durations (ms) for a turn: the RAG trace plus detection and handler total."""
+        stages = {k: v for k, v in trace.get("timings", {}).items() if k != "overlap"}
+        stages["detect_language"] = round(detect_ms, 1)
+        stages["handler"] = round((time.perf_counter() - start) * 1000, 1)
+        return stages
+    
+    async def end_session(self, call_sid: str):
+        await self.active_sessions.pop(call_sid)